@@ -5,15 +5,23 @@ import os
 # Ajouter le répertoire src au path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from flask import Flask, send_from_directory, send_file
+from flask import Flask
 from flask_cors import CORS
 from src.models.employee import db
+from src.database import configure_database, init_database
 from src.routes.auth import auth_bp
 from src.routes.employee import employee_bp
 from src.routes.timeentry import timeentry_bp
 from src.routes.export import export_bp
+from src.routes.overtime import overtime_bp
+from src.routes.metrics import metrics_bp
+from src.metrics import init_metrics
+from src.slow_queries import init_slow_query_log
+from src.static_files import register_static_routes
 
-app = Flask(__name__, static_folder='static', static_url_path='')
+# Les fichiers statiques sont servis par register_static_routes (manifeste précompressé)
+app = Flask(__name__, static_folder=None)
+static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
 
 # Configuration pour la production
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'pointeuse_production_key_2024_secure_v2')
@@ -25,13 +33,40 @@ app.config['SESSION_COOKIE_SECURE'] = True  # HTTPS en production
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 
-# Configuration de la base de données
+# Jeton des badgeuses pour l'envoi groupé de pointages (désactivé si absent)
+app.config['TERMINAL_TOKEN'] = os.environ.get('TERMINAL_TOKEN')
+
+# Métriques par endpoint (/metrics) ; jeton optionnel pour le scraper Prometheus
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') != '0'
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+
+# Seuil (ms) du journal des requêtes SQL lentes, 0 pour le désactiver
+app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', 200))
+
+# Exports en tâche de fond (?async=1) : threads, durée de conservation (s), dossier des fichiers
+app.config['EXPORT_JOB_WORKERS'] = int(os.environ.get('EXPORT_JOB_WORKERS', 2))
+app.config['EXPORT_JOB_TTL'] = int(os.environ.get('EXPORT_JOB_TTL', 3600))
+app.config['EXPORT_JOB_DIR'] = os.environ.get('EXPORT_JOB_DIR')
+app.config['EXPORT_JOB_MAX_PENDING'] = int(os.environ.get('EXPORT_JOB_MAX_PENDING', 10))
+
+# Compression gzip/zstd des exports CSV et des listes JSON : taille minimale (octets) et niveaux
+app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+app.config['COMPRESSION_GZIP_LEVEL'] = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+app.config['COMPRESSION_ZSTD_LEVEL'] = int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3))
+
+# Dossier des archives annuelles de pointages (archive_entries.py) ; défaut : archive/ à côté de la base
+app.config['ARCHIVE_DIR'] = os.environ.get('ARCHIVE_DIR')
+
+# Paliers d'heures supplémentaires hebdomadaires (seuil:majoration %, ex. 39:25,43:50)
+app.config['OVERTIME_TIERS'] = os.environ.get('OVERTIME_TIERS', '35:25,43:50')
+
+# Configuration de la base de données (profil SQLite : SQLITE_PROFILE)
 database_path = os.path.join(os.path.dirname(__file__), 'database', 'app.db')
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database_path}'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # Initialisation des extensions
-db.init_app(app)
+configure_database(app, database_path)
+init_metrics(app)
+init_slow_query_log(app)
 CORS(app, supports_credentials=True, origins=['*'])
 
 # Enregistrement des blueprints
@@ -39,48 +74,21 @@ app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(employee_bp, url_prefix='/api')
 app.register_blueprint(timeentry_bp, url_prefix='/api')
 app.register_blueprint(export_bp, url_prefix='/api')
+app.register_blueprint(overtime_bp, url_prefix='/api')
+app.register_blueprint(metrics_bp)
 
-# Création des tables et initialisation
-with app.app_context():
-    os.makedirs(os.path.dirname(database_path), exist_ok=True)
-    db.create_all()
-    
-    # Vérifier si l'admin existe, sinon le créer
-    from src.models.employee import Employee
-    from src.routes.auth import hash_password
-    
-    admin = Employee.query.filter_by(employee_number='ADMIN001').first()
-    if not admin:
-        admin = Employee(
-            employee_number='ADMIN001',
-            first_name='Administrateur',
-            last_name='Système',
-            email='admin@pointeuse.local',
-            password_hash=hash_password('admin123'),
-            is_admin=True,
-            is_active=True
-        )
-        db.session.add(admin)
-        db.session.commit()
+# Création des tables et de l'administrateur par défaut : à l'import, ou par
+# init_db.py avec APP_INIT=lazy (démarrage à froid sans requête SQL)
+os.makedirs(os.path.dirname(database_path), exist_ok=True)
+init_database(app, default_admin=True)
 
 @app.route('/health')
 def health():
     """Point de contrôle de santé pour le déploiement"""
     return {'status': 'healthy', 'app': 'pointeuse-horaire'}, 200
 
-@app.route('/')
-def serve_frontend():
-    """Servir la page d'accueil du frontend"""
-    return send_file(os.path.join(app.static_folder, 'index.html'))
-
-@app.route('/<path:path>')
-def serve_static_files(path):
-    """Servir les fichiers statiques du frontend"""
-    try:
-        return send_from_directory(app.static_folder, path)
-    except:
-        # Si le fichier n'existe pas, servir index.html pour le routing côté client
-        return send_file(os.path.join(app.static_folder, 'index.html'))
+# Frontend : fichiers statiques et index.html pour le routing côté client
+register_static_routes(app, static_folder)
 
 # Pour Vercel
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Script d'archivage des pointages des années closes (un fichier SQLite par année)
+
+    python archive_entries.py --list            # partitions archivées
+    python archive_entries.py --year 2022       # archiver une année
+    python archive_entries.py --before 2024     # archiver toutes les années antérieures
+    python archive_entries.py --before 2024 --vacuum
+
+Les fichiers sont écrits dans ARCHIVE_DIR (par défaut database/archive/) et
+attachés à la demande par l'application ; un fichier d'archive ne change
+plus une fois écrit et peut être sauvegardé une seule fois.
+"""
+import argparse
+import os
+import sys
+
+# Ajouter le répertoire courant au path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import func, text
+from src.main import create_app
+from src.models.employee import db, TimeEntry
+from src.models.archive import ArchivePartition, archive_year
+
+def main():
+    parser = argparse.ArgumentParser(description='Archiver les pointages des années closes')
+    parser.add_argument('--year', type=int, action='append', default=[], help='Année à archiver (répétable)')
+    parser.add_argument('--before', type=int, help='Archiver toutes les années antérieures à celle-ci')
+    parser.add_argument('--list', action='store_true', help='Lister les partitions archivées')
+    parser.add_argument('--vacuum', action='store_true', help='Compacter la base principale après archivage')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        years = set(args.year)
+        if args.before:
+            stored = db.session.query(func.distinct(func.strftime('%Y', TimeEntry.date))).all()
+            years |= {int(year) for (year,) in stored if int(year) < args.before}
+
+        try:
+            for year in sorted(years):
+                moved = archive_year(year)
+                print(f"✅ {year} : {moved} pointage(s) déplacé(s) vers l'archive")
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+        if years and args.vacuum:
+            db.session.execute(text('VACUUM'))
+            print("✅ Base principale compactée.")
+
+        if args.list or not years:
+            partitions = ArchivePartition.query.order_by(ArchivePartition.year).all()
+            if not partitions:
+                print("Aucune année archivée.")
+            for partition in partitions:
+                print(f"   {partition.year} : {partition.entries} pointage(s) dans {partition.filename} "
+                      f"(archivé le {partition.archived_at:%Y-%m-%d %H:%M})")
+
+if __name__ == '__main__':
+    main()
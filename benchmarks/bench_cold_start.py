@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Profil du démarrage à froid de l'application Vercel (app.py)
+
+Pour chaque mode APP_INIT, lance des processus neufs qui importent app.py
+puis servent une première requête, et mesure les deux durées. Un passage
+supplémentaire avec `python -X importtime` liste les imports les plus
+coûteux. Le script sort en erreur (code 1) si la médiane du démarrage
+(import + première requête) dépasse le budget, pour servir de garde-fou en CI :
+
+    python benchmarks/bench_cold_start.py --budget-ms 1000
+    python benchmarks/bench_cold_start.py --modes lazy --top 30
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Exécuté dans le processus mesuré
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get('/health')
+served = time.perf_counter()
+print(json.dumps({{'import_ms': (imported - started) * 1000, 'first_request_ms': (served - imported) * 1000,
+                   'status': response.status_code}}))
+"""
+
+def run_child(env, importtime=False):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', CHILD.format(root=ROOT)]
+    result = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+def parse_importtime(stderr):
+    """(module, self µs, cumulé µs) de la sortie de -X importtime"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', default=['eager', 'lazy'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1000.0,
+                        help='Durée maximale import + première requête (médiane)')
+    parser.add_argument('--top', type=int, default=15, help='Nombre d\'imports les plus lents affichés')
+    args = parser.parse_args()
+
+    # Base déjà initialisée, comme après le déploiement (init_db.py)
+    database_path = os.path.join(tempfile.mkdtemp(), 'bench_cold_start.db')
+    base_env = dict(os.environ, DATABASE_URL=f'sqlite:///{database_path}')
+    subprocess.run([sys.executable, os.path.join(ROOT, 'init_db.py')], env=base_env, check=True,
+                   capture_output=True)
+
+    over_budget = []
+    for mode in args.modes:
+        env = dict(base_env, APP_INIT=mode)
+        runs = [run_child(env)[0] for _ in range(args.repeat)]
+        import_ms = statistics.median(run['import_ms'] for run in runs)
+        first_request_ms = statistics.median(run['first_request_ms'] for run in runs)
+        total_ms = statistics.median(run['import_ms'] + run['first_request_ms'] for run in runs)
+        print(f"mode={mode:<6} import={import_ms:.0f}ms first_request={first_request_ms:.0f}ms "
+              f"total={total_ms:.0f}ms budget={args.budget_ms:.0f}ms")
+        if total_ms > args.budget_ms:
+            over_budget.append(mode)
+
+        _, stderr = run_child(env, importtime=True)
+        imports = sorted(parse_importtime(stderr), key=lambda item: item[1], reverse=True)
+        for name, self_us, cumulative_us in imports[:args.top]:
+            print(f"    {self_us / 1000:8.1f}ms self {cumulative_us / 1000:8.1f}ms cumulé  {name}")
+
+    if over_budget:
+        print(f"❌ Budget de démarrage dépassé : {', '.join(over_budget)}")
+        sys.exit(1)
+    print("✅ Démarrage dans le budget.")
+
+if __name__ == '__main__':
+    main()
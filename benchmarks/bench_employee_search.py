@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la recherche d'employés : index plein texte (FTS5) vs ILIKE
+
+Crée une base temporaire de N employés puis mesure, pour chaque terme, la
+latence d'une page de résultats de /api/admin/employees (requête + COUNT) :
+
+    python benchmarks/bench_employee_search.py --employees 100000 --repeat 20
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIRST_NAMES = ['Jean', 'Marie', 'Pierre', 'Sophie', 'Luc', 'Camille', 'Hélène', 'Nicolas', 'Julie', 'Éric']
+LAST_NAMES = ['Dupont', 'Martin', 'Bernard', 'Durand', 'Lefèvre', 'Moreau', 'Laurent', 'Simon', 'Michel', 'Garcia']
+
+def seed(employees):
+    from src.models.employee import db, Employee
+
+    rng = random.Random(42)
+    rows = []
+    for i in range(employees):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = f'{rng.choice(LAST_NAMES)}{i % 997}'
+        rows.append({
+            'employee_number': f'EMP{i:06d}',
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': f'{first_name.lower()}.{last_name.lower()}.{i}@bench.local',
+            'password_hash': 'x',
+            'is_admin': False,
+            'is_active': True
+        })
+    db.session.execute(Employee.__table__.insert(), rows)
+    db.session.commit()
+
+def measure(term, repeat, use_fts):
+    from src.models.employee import Employee
+    from src.models import search
+
+    search._fts_status[str(search.db.engine.url)] = use_fts
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        page = search.search_employees(Employee.query, term).paginate(page=1, per_page=20, error_out=False)
+        [employee.to_dict() for employee in page.items]
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return page.total, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--terms', nargs='+', default=['dup', 'Martin42', 'helene', 'EMP0123', 'jean dur'])
+    args = parser.parse_args()
+
+    database_path = os.path.join(tempfile.mkdtemp(), 'bench_search.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{database_path}'
+
+    from src.main import create_app
+    from src.models.search import fts_available
+
+    app = create_app()
+    with app.app_context():
+        seed(args.employees)
+        if not fts_available():
+            print('❌ FTS5 indisponible dans ce SQLite')
+            return
+
+        for term in args.terms:
+            for mode, use_fts in (('ilike', False), ('fts', True)):
+                total, p50, p95 = measure(term, args.repeat, use_fts)
+                print(f"term={term!r:<12} mode={mode:<6} matches={total:<7} "
+                      f"p50={p50 * 1000:.1f}ms p95={p95 * 1000:.1f}ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'export CSV des pointages (/api/admin/export/csv)
+
+Génère une base SQLite synthétique (1M de pointages par défaut) puis mesure,
+dans un processus séparé, le débit (lignes/s) et le pic de mémoire (RSS)
+de l'export :
+
+    python benchmarks/bench_export_csv.py --rows 1000000
+
+Le mode `legacy` reproduit l'ancienne implémentation (query.all() puis
+fichier complet construit dans un StringIO) pour comparaison.
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from src.models.employee import db, Employee, TimeEntry
+from src.routes.auth import auth_bp
+from src.routes.export import export_bp, CSV_HEADERS
+
+def create_bench_app(database_path):
+    """Application minimale pointant sur la base de benchmark"""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'benchmark'
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(export_bp, url_prefix='/api')
+    return app
+
+def seed(database_path, rows, employees):
+    """Créer les employés et les pointages synthétiques"""
+    app = create_bench_app(database_path)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(Employee.__table__.insert(), [
+            {
+                'id': i,
+                'employee_number': f'EMP{i:06d}',
+                'first_name': f'Prenom{i}',
+                'last_name': f'Nom{i % 500}',
+                'email': f'emp{i}@bench.local',
+                'password_hash': 'x',
+                'is_admin': i == 1,
+                'is_active': True
+            }
+            for i in range(1, employees + 1)
+        ])
+
+        days = rows // employees + 1
+        start = date(2020, 1, 1)
+        batch = []
+        inserted = 0
+        for day in range(days):
+            entry_date = start + timedelta(days=day)
+            for employee_id in range(1, employees + 1):
+                if inserted >= rows:
+                    break
+                morning = random.randint(0, 59)
+                batch.append({
+                    'employee_id': employee_id,
+                    'date': entry_date,
+                    'morning_in': dtime(8, morning),
+                    'lunch_out': dtime(12, 0),
+                    'lunch_in': dtime(13, 0),
+                    'evening_out': dtime(17, morning),
+                    'morning_hours': (240 - morning) / 60,
+                    'afternoon_hours': (240 + morning) / 60,
+                    'total_hours': 8.0
+                })
+                inserted += 1
+                if len(batch) >= 10000:
+                    db.session.execute(TimeEntry.__table__.insert(), batch)
+                    batch = []
+        if batch:
+            db.session.execute(TimeEntry.__table__.insert(), batch)
+        db.session.commit()
+    return inserted
+
+def legacy_export():
+    """Ancienne implémentation : tout charger puis tout écrire en mémoire"""
+    query = db.session.query(TimeEntry, Employee).join(Employee)
+    query = query.order_by(TimeEntry.date.desc(), Employee.last_name, Employee.first_name)
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_HEADERS)
+    for time_entry, employee in query.all():
+        writer.writerow([
+            time_entry.date.strftime('%Y-%m-%d'),
+            employee.employee_number,
+            employee.first_name,
+            employee.last_name,
+            time_entry.morning_in.strftime('%H:%M') if time_entry.morning_in else '',
+            time_entry.lunch_out.strftime('%H:%M') if time_entry.lunch_out else '',
+            time_entry.lunch_in.strftime('%H:%M') if time_entry.lunch_in else '',
+            time_entry.evening_out.strftime('%H:%M') if time_entry.evening_out else '',
+            f'{time_entry.morning_hours:.2f}',
+            f'{time_entry.afternoon_hours:.2f}',
+            f'{time_entry.total_hours:.2f}'
+        ])
+    return output.getvalue()
+
+def run_export(database_path, mode):
+    """Exécuter l'export et afficher débit et pic RSS du processus"""
+    app = create_bench_app(database_path)
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['employee_id'] = 1
+
+    started = time.perf_counter()
+    if mode == 'legacy':
+        with app.app_context():
+            body = legacy_export()
+        lines = body.count('\n')
+        size = len(body)
+    else:
+        response = client.get('/api/admin/export/csv')
+        lines = 0
+        size = 0
+        for chunk in response.response:
+            lines += chunk.count(b'\n') if isinstance(chunk, bytes) else chunk.count('\n')
+            size += len(chunk)
+    elapsed = time.perf_counter() - started
+
+    rows = lines - 1
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f'mode={mode} rows={rows} size={size / 1e6:.1f}MB '
+          f'elapsed={elapsed:.2f}s rows/s={rows / elapsed:,.0f} peak_rss={peak_rss_mb:.1f}MB')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--employees', type=int, default=300)
+    parser.add_argument('--mode', choices=['stream', 'legacy', 'both'], default='both')
+    parser.add_argument('--database', help='Réutiliser une base déjà générée')
+    parser.add_argument('--export-only', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.export_only:
+        run_export(args.database, args.mode)
+        return
+
+    database_path = args.database
+    if not database_path or not os.path.exists(database_path):
+        database_path = database_path or os.path.join(tempfile.mkdtemp(), 'bench_export.db')
+        started = time.perf_counter()
+        inserted = seed(database_path, args.rows, args.employees)
+        print(f'seed: {inserted} pointages en {time.perf_counter() - started:.1f}s ({database_path})')
+
+    # Chaque mesure tourne dans un processus neuf pour isoler le pic RSS
+    modes = ['stream', 'legacy'] if args.mode == 'both' else [args.mode]
+    for mode in modes:
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--export-only',
+                        '--database', database_path, '--mode', mode], check=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark d'un pic de connexions (changement d'équipe) pendant des pointages
+
+Des employés déjà connectés pointent en continu pendant que N employés se
+connectent simultanément ; on mesure la latence des pointages et des
+connexions pour chaque taille du pool de vérification (PASSWORD_WORKERS),
+dans un processus séparé par configuration :
+
+    python benchmarks/bench_login_burst.py --logins 300 --workers 2 4 64
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PUNCHES = ['morning_in', 'lunch_out', 'lunch_in', 'evening_out']
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[max(int(len(values) * fraction) - 1, 0)] if values else 0.0
+
+def run(logins, punchers, threads):
+    from src.main import create_app
+    from src.models.employee import db, Employee
+    from src.passwords import hash_password, calibrate_rounds, password_verifier
+
+    app = create_app()
+    with app.app_context():
+        password_hash = hash_password('benchmark')
+        db.session.execute(Employee.__table__.insert(), [
+            {
+                'employee_number': f'EMP{i:05d}',
+                'first_name': f'Prenom{i}',
+                'last_name': f'Nom{i}',
+                'email': f'emp{i}@bench.local',
+                'password_hash': password_hash,
+                'is_admin': False,
+                'is_active': True
+            }
+            for i in range(logins + punchers)
+        ])
+        db.session.commit()
+
+    # Employés déjà connectés avant le pic
+    punch_clients = []
+    for index in range(punchers):
+        client = app.test_client()
+        client.post('/api/auth/login', json={'employee_number': f'EMP{logins + index:05d}', 'password': 'benchmark'})
+        punch_clients.append(client)
+
+    login_latencies, punch_latencies = [], []
+    statuses = {}
+    lock = threading.Lock()
+    burst_done = threading.Event()
+
+    def login(index):
+        started = time.perf_counter()
+        response = app.test_client().post('/api/auth/login',
+                                          json={'employee_number': f'EMP{index:05d}', 'password': 'benchmark'})
+        with lock:
+            login_latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    def punch(client):
+        for punch_type in PUNCHES * 1000:
+            if burst_done.is_set():
+                return
+            started = time.perf_counter()
+            response = client.post('/api/punch', json={'type': punch_type})
+            if response.status_code == 400:
+                # Journée complète : repartir d'une journée vide
+                with app.app_context():
+                    db.session.execute(db.text('DELETE FROM time_entry WHERE employee_id = '
+                                               '(SELECT id FROM employee WHERE employee_number = :number)'),
+                                       {'number': client.number})
+                    db.session.commit()
+                continue
+            with lock:
+                punch_latencies.append(time.perf_counter() - started)
+
+    for index, client in enumerate(punch_clients):
+        client.number = f'EMP{logins + index:05d}'
+    punch_threads = [threading.Thread(target=punch, args=(client,)) for client in punch_clients]
+    for thread in punch_threads:
+        thread.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    burst_done.set()
+    for thread in punch_threads:
+        thread.join()
+
+    print(f"workers={password_verifier.workers:<3} rounds={calibrate_rounds()} logins={logins} in {elapsed:.1f}s "
+          f"login_p50={statistics.median(login_latencies) * 1000:.0f}ms "
+          f"login_p95={percentile(login_latencies, 0.95) * 1000:.0f}ms "
+          f"punch_p50={statistics.median(punch_latencies) * 1000:.1f}ms "
+          f"punch_p95={percentile(punch_latencies, 0.95) * 1000:.1f}ms "
+          f"statuses={dict(sorted(statuses.items()))}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=300)
+    parser.add_argument('--punchers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=64, help='Connexions simultanées')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 64])
+    parser.add_argument('--queue-size', type=int, default=1000)
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run(args.logins, args.punchers, args.threads)
+        return
+
+    for workers in args.workers:
+        database_path = os.path.join(tempfile.mkdtemp(), 'bench_login.db')
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{database_path}',
+                   PASSWORD_WORKERS=str(workers), PASSWORD_QUEUE_SIZE=str(args.queue_size))
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--run', '--logins', str(args.logins),
+                        '--punchers', str(args.punchers), '--threads', str(args.threads)],
+                       env=env, check=True)
+
+if __name__ == '__main__':
+    main()
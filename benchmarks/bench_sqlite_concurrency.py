@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark des écritures concurrentes sur /api/punch selon le profil SQLite
+
+Chaque employé synthétique effectue ses 4 pointages de la journée ; tous
+les employés démarrent en même temps (prise de poste). Le benchmark est
+exécuté pour chaque profil dans un processus séparé, sur une base neuve :
+
+    python benchmarks/bench_sqlite_concurrency.py --employees 200 --threads 32
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PUNCHES = ['morning_in', 'lunch_out', 'lunch_in', 'evening_out']
+
+def run_profile(employees, threads):
+    """Mesurer les pointages concurrents avec le profil de SQLITE_PROFILE"""
+    from src.main import create_app
+    from src.models.employee import db, Employee
+    from src.passwords import hash_password
+
+    app = create_app()
+    with app.app_context():
+        password_hash = hash_password('benchmark')
+        db.session.execute(Employee.__table__.insert(), [
+            {
+                'employee_number': f'EMP{i:05d}',
+                'first_name': f'Prenom{i}',
+                'last_name': f'Nom{i}',
+                'email': f'emp{i}@bench.local',
+                'password_hash': password_hash,
+                'is_admin': False,
+                'is_active': True
+            }
+            for i in range(employees)
+        ])
+        db.session.commit()
+
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(min(threads, employees))
+
+    def employee_day(index):
+        client = app.test_client()
+        client.post('/api/auth/login', json={'employee_number': f'EMP{index:05d}', 'password': 'benchmark'})
+        if index < start_barrier.parties:
+            start_barrier.wait()
+        for punch_type in PUNCHES:
+            started = time.perf_counter()
+            response = client.post('/api/punch', json={'type': punch_type})
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(employee_day, range(employees)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    errors = sum(count for status, count in statuses.items() if status != 200)
+    print(f"profile={os.environ['SQLITE_PROFILE']:<10} punches={len(latencies)} "
+          f"throughput={len(latencies) / elapsed:,.0f}/s p50={statistics.median(latencies) * 1000:.1f}ms "
+          f"p95={p95 * 1000:.1f}ms errors={errors} statuses={dict(sorted(statuses.items()))}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--profiles', nargs='+', default=['default', 'production'])
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_profile(args.employees, args.threads)
+        return
+
+    for profile in args.profiles:
+        database_path = os.path.join(tempfile.mkdtemp(), 'bench_concurrency.db')
+        env = dict(os.environ, SQLITE_PROFILE=profile, DATABASE_URL=f'sqlite:///{database_path}')
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--run',
+                        '--employees', str(args.employees), '--threads', str(args.threads)],
+                       env=env, check=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Conseiller d'index : rejoue les requêtes de l'application et analyse leurs plans
+
+Chaque forme de requête (liste des pointages, historique, exports, rapports...)
+est rejouée par le client de test Flask ; les instructions SQL émises sont
+capturées puis passées à EXPLAIN QUERY PLAN. Le rapport indique, par forme,
+les index utilisés, les parcours complets de table, les index automatiques
+(index manquant) et les tris en B-tree temporaire, puis les index jamais
+utilisés :
+
+    python benchmarks/index_advisor.py --employees 300 --days 400
+    DATABASE_URL=sqlite:////chemin/app.db python benchmarks/index_advisor.py --no-seed
+    python benchmarks/index_advisor.py --slow-queries lentes.json   # sortie de GET /api/admin/slow-queries
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from datetime import date, time, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'conseil'
+
+# (nom, session, chemin) : formes de requête de l'application, en lecture
+def query_shapes(today, employee_id):
+    month_ago = (today - timedelta(days=30)).isoformat()
+    mid_year = (today - timedelta(days=200)).isoformat()
+    return [
+        ('entries_page', 'admin', '/api/admin/entries?page=3&per_page=50'),
+        ('entries_cursor', 'admin', '/api/admin/entries?cursor=&per_page=50'),
+        ('entries_date_range', 'admin', f'/api/admin/entries?start_date={month_ago}&per_page=50'),
+        ('entries_employee', 'admin', f'/api/admin/entries?employee_id={employee_id}&per_page=50'),
+        ('employees_page', 'admin', '/api/admin/employees?page=2&per_page=50'),
+        ('export_csv_range', 'admin', f'/api/admin/export/csv?start_date={month_ago}'),
+        ('export_csv_employee', 'admin', f'/api/admin/export/csv?employee_id={employee_id}'),
+        ('export_summary', 'admin', f'/api/admin/export/summary?start_date={mid_year}&end_date={month_ago}'),
+        ('export_monthly', 'admin', f'/api/admin/export/monthly?year={today.year}&month={today.month}'),
+        ('overtime', 'admin', f'/api/admin/overtime?start_date={month_ago}'),
+        ('history', 'employee', '/api/history?per_page=20'),
+        ('history_cursor', 'employee', '/api/history?cursor=&per_page=20'),
+        ('today', 'employee', '/api/today'),
+        ('employee_summary', 'employee', f'/api/summary?start_date={mid_year}')
+    ]
+
+_INDEX_USE = re.compile(r'^(?:SCAN|SEARCH) (\w+)(?: AS \w+)? USING (?:COVERING )?INDEX (\w+)')
+_FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+_AUTOMATIC = re.compile(r'USING AUTOMATIC (?:PARTIAL )?(?:COVERING )?INDEX')
+
+def classify_plan(plan):
+    """Index utilisés, tables parcourues en entier, index automatiques et tris temporaires d'un plan"""
+    result = {'indexes': [], 'full_scans': [], 'automatic_indexes': [], 'temp_btrees': []}
+    for detail in plan:
+        if _AUTOMATIC.search(detail):
+            result['automatic_indexes'].append(detail)
+        elif match := _INDEX_USE.match(detail):
+            result['indexes'].append(match.group(2))
+        elif match := _FULL_SCAN.match(detail):
+            result['full_scans'].append(match.group(1))
+        if 'USE TEMP B-TREE' in detail:
+            result['temp_btrees'].append(detail)
+    return result
+
+def seed(app, employees, days):
+    from src.models.employee import db, Employee, TimeEntry
+    from src.models.rollup import rebuild_totals
+    from src.maintenance import ensure_default_admin
+    from src.passwords import hash_password
+
+    with app.app_context():
+        ensure_default_admin()
+        password_hash = hash_password(PASSWORD)
+        db.session.execute(Employee.__table__.insert(), [
+            {
+                'employee_number': f'EMP{i:05d}',
+                'first_name': f'Prenom{i % 37}',
+                'last_name': f'Nom{i % 101}',
+                'email': f'emp{i}@conseil.local',
+                'password_hash': password_hash,
+                'is_admin': False,
+                'is_active': i % 10 != 0
+            }
+            for i in range(employees)
+        ])
+        ids = [row.id for row in db.session.query(Employee.id).filter(Employee.employee_number.like('EMP%'))]
+        first_day = date.today() - timedelta(days=days)
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            if day.weekday() >= 5:
+                continue
+            db.session.execute(TimeEntry.__table__.insert(), [
+                {
+                    'employee_id': employee_id, 'date': day,
+                    'morning_in': time(8), 'lunch_out': time(12), 'lunch_in': time(13), 'evening_out': time(17),
+                    'morning_hours': 4.0, 'afternoon_hours': 4.0, 'total_hours': 8.0
+                }
+                for employee_id in ids
+            ])
+        rebuild_totals()
+        db.session.commit()
+        return ids[0]
+
+def explain(connection, statement, parameters):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters or ())
+        return [row[3] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def replay(app, shapes):
+    """Rejouer chaque forme et analyser le plan de ses instructions SELECT"""
+    from sqlalchemy import event
+    from src.models.employee import db
+
+    captured = []
+    with app.app_context():
+        engine = db.engine
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            captured.append((statement, parameters))
+    event.listen(engine, 'before_cursor_execute', capture)
+
+    clients = {'admin': app.test_client(), 'employee': app.test_client()}
+    clients['admin'].post('/api/auth/login', json={'employee_number': 'ADMIN001', 'password': 'admin123'})
+    clients['employee'].post('/api/auth/login', json={'employee_number': 'EMP00001', 'password': PASSWORD})
+
+    results = []
+    connection = engine.raw_connection()
+    try:
+        for name, session, path in shapes:
+            captured.clear()
+            response = clients[session].get(path)
+            response.close()
+            statements = []
+            seen = set()
+            for statement, parameters in captured:
+                if statement in seen:
+                    continue
+                seen.add(statement)
+                plan = explain(connection, statement, parameters)
+                statements.append({'sql': ' '.join(statement.split()), 'plan': plan, **classify_plan(plan)})
+            results.append({'shape': name, 'path': path, 'status': response.status_code, 'statements': statements})
+    finally:
+        connection.close()
+        event.remove(engine, 'before_cursor_execute', capture)
+    return results
+
+def declared_indexes(app):
+    from sqlalchemy import text
+    from src.models.employee import db
+
+    with app.app_context():
+        rows = db.session.execute(text(
+            "SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' ORDER BY tbl_name, name"
+        )).all()
+    return {name: table for name, table in rows}
+
+def table_sizes(app):
+    from sqlalchemy import text
+    from src.models.employee import db
+
+    with app.app_context():
+        tables = db.session.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND sql NOT LIKE 'CREATE VIRTUAL%'"
+        )).scalars().all()
+        return {table: db.session.execute(text(f'SELECT count(*) FROM "{table}"')).scalar() for table in tables}
+
+def report(results, indexes, sizes, min_rows):
+    usage = {name: 0 for name in indexes}
+    for result in results:
+        issues = []
+        used = set()
+        for statement in result['statements']:
+            used.update(statement['indexes'])
+            # Parcourir une petite table en entier est normal
+            issues += [f'parcours complet de {table} ({sizes[table]} lignes)'
+                       for table in statement['full_scans'] if sizes.get(table, 0) >= min_rows]
+            issues += [f'index automatique : {detail}' for detail in statement['automatic_indexes']]
+            issues += [detail.lower() for detail in statement['temp_btrees']]
+        for name in used:
+            usage[name] = usage.get(name, 0) + 1
+        result['indexes_used'] = sorted(used)
+        result['issues'] = issues
+
+        marker = '✅' if not issues else '⚠️ '
+        print(f"{marker} {result['shape']:<22} {result['status']}  index : {', '.join(sorted(used)) or '-'}")
+        for issue in dict.fromkeys(issues):
+            print(f"      {issue}")
+
+    # Les index sqlite_autoindex_* portent des contraintes (clé primaire, unicité)
+    unused = [name for name, count in usage.items() if not count and not name.startswith('sqlite_')]
+    print("\nUtilisation des index :")
+    for name, count in sorted(usage.items(), key=lambda item: -item[1]):
+        print(f"   {name:<42} {indexes.get(name, '?'):<24} {count} forme(s)")
+    if unused:
+        print(f"Index jamais utilisés par ces formes : {', '.join(unused)}")
+    return {'shapes': results, 'index_usage': usage, 'unused_indexes': unused}
+
+def analyze_slow_queries(path):
+    """Classer les plans enregistrés par le journal des requêtes lentes"""
+    with open(path, encoding='utf-8') as source:
+        data = json.load(source)
+    entries = data.get('queries', []) if isinstance(data, dict) else data
+    for entry in entries:
+        summary = classify_plan(entry.get('plan') or [])
+        print(f"{entry.get('duration_ms', '?'):>8} ms  {entry.get('endpoint')}  index : "
+              f"{', '.join(summary['indexes']) or '-'}")
+        for table in summary['full_scans']:
+            print(f"      parcours complet de {table}")
+        for detail in summary['automatic_indexes'] + summary['temp_btrees']:
+            print(f"      {detail.lower()}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=200)
+    parser.add_argument('--days', type=int, default=400, help='Jours de pointages générés')
+    parser.add_argument('--no-seed', action='store_true', help='Analyser la base DATABASE_URL telle quelle')
+    parser.add_argument('--min-rows', type=int, default=1000,
+                        help='Taille à partir de laquelle un parcours complet de table est signalé')
+    parser.add_argument('--no-analyze', action='store_true', help='Ne pas lancer ANALYZE avant l\'analyse')
+    parser.add_argument('--slow-queries', help='Fichier JSON de GET /api/admin/slow-queries à analyser')
+    parser.add_argument('--output', help='Écrire le rapport en JSON')
+    args = parser.parse_args()
+
+    if args.slow_queries:
+        analyze_slow_queries(args.slow_queries)
+        return
+
+    if not args.no_seed:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'advisor.db')}"
+    os.environ.setdefault('BCRYPT_ROUNDS', '10')
+    os.environ['METRICS_ENABLED'] = '0'
+
+    from sqlalchemy import text
+    from src.main import create_app
+    from src.models.employee import db
+    app = create_app()
+
+    employee_id = 1
+    if not args.no_seed:
+        employee_id = seed(app, args.employees, args.days)
+    if not args.no_analyze:
+        # Statistiques de l'optimiseur (sqlite_stat1), comme sur une base en service
+        with app.app_context():
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+
+    results = replay(app, query_shapes(date.today(), employee_id))
+    summary = report(results, declared_indexes(app), table_sizes(app), args.min_rows)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(summary, output, indent=2, ensure_ascii=False)
+        print(f"✅ Rapport écrit dans {args.output}")
+
+if __name__ == '__main__':
+    main()
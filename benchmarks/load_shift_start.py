@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Test de charge « prise de poste » : connexion, pointages et /today
+
+N employés synthétiques arrivent dans une fenêtre de quelques secondes ou
+minutes ; chacun se connecte, consulte /api/today, puis enchaîne ses 4
+pointages (morning_in, lunch_out, lunch_in, evening_out) en relisant
+/api/today après chacun. L'application tourne dans le processus (client de
+test Flask) ou derrière un serveur WSGI local (--server). Les latences
+p50/p95/p99, taux d'erreur et délais de verrou (503) sont écrits en JSON,
+comparables d'un commit à l'autre :
+
+    python benchmarks/load_shift_start.py --employees 500 --concurrency 32 --window 60 --output avant.json
+    python benchmarks/load_shift_start.py --employees 500 --concurrency 32 --window 60 --compare avant.json
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PUNCHES = ['morning_in', 'lunch_out', 'lunch_in', 'evening_out']
+PASSWORD = 'chargement'
+
+
+class InProcessClient:
+    """Client de test Flask (un par employé : cookie de session propre)"""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self._client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+
+
+class HttpClient:
+    """Client HTTP vers le serveur WSGI local (un par employé)"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with self._opener.open(request, timeout=60) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, error.read()
+
+
+class Recorder:
+    """Latences et statuts par opération (login, today, punch:<type>)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, operation, status, elapsed):
+        with self._lock:
+            self.samples.setdefault(operation, []).append((status, elapsed))
+
+    def report(self):
+        operations = {}
+        for operation, samples in sorted(self.samples.items()):
+            latencies = sorted(elapsed for _, elapsed in samples)
+            statuses = {}
+            for status, _ in samples:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+            errors = sum(1 for status, _ in samples if status >= 400)
+            operations[operation] = {
+                'count': len(samples),
+                'p50_ms': round(_percentile(latencies, 0.50) * 1000, 2),
+                'p95_ms': round(_percentile(latencies, 0.95) * 1000, 2),
+                'p99_ms': round(_percentile(latencies, 0.99) * 1000, 2),
+                'max_ms': round(latencies[-1] * 1000, 2),
+                'error_rate': round(errors / len(samples), 4),
+                'lock_timeouts': statuses.get('503', 0),
+                'statuses': statuses
+            }
+        return operations
+
+def _percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+def seed(app, employees):
+    from src.models.employee import db, Employee
+    from src.passwords import hash_password
+
+    with app.app_context():
+        password_hash = hash_password(PASSWORD)
+        db.session.execute(Employee.__table__.insert(), [
+            {
+                'employee_number': f'EMP{i:05d}',
+                'first_name': f'Prenom{i}',
+                'last_name': f'Nom{i}',
+                'email': f'emp{i}@charge.local',
+                'password_hash': password_hash,
+                'is_admin': False,
+                'is_active': True
+            }
+            for i in range(employees)
+        ])
+        db.session.commit()
+
+def employee_day(client, number, recorder, think):
+    """Séquence d'une journée ; s'arrête au premier refus de connexion"""
+    def timed(operation, method, path, body=None):
+        started = time.perf_counter()
+        status, _ = client.request(method, path, body)
+        recorder.record(operation, status, time.perf_counter() - started)
+        return status
+
+    if timed('login', 'POST', '/api/auth/login', {'employee_number': number, 'password': PASSWORD}) != 200:
+        return
+    timed('today', 'GET', '/api/today')
+    for punch_type in PUNCHES:
+        if think:
+            time.sleep(random.uniform(0, think))
+        timed(f'punch:{punch_type}', 'POST', '/api/punch', {'type': punch_type})
+        timed('today', 'GET', '/api/today')
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, baseline):
+    """Afficher l'évolution du p95 et du taux d'erreur par opération"""
+    print(f"\nComparaison avec {baseline['meta'].get('commit')} ({baseline['meta'].get('started_at')}):")
+    for operation, stats in current['operations'].items():
+        previous = baseline['operations'].get(operation)
+        if not previous:
+            print(f"   {operation:<22} (nouvelle opération)")
+            continue
+        change = (stats['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100 if previous['p95_ms'] else 0.0
+        print(f"   {operation:<22} p95 {previous['p95_ms']:8.1f} -> {stats['p95_ms']:8.1f} ms ({change:+.0f} %)  "
+              f"erreurs {previous['error_rate']:.2%} -> {stats['error_rate']:.2%}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--employees', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=32, help='Employés traités simultanément')
+    parser.add_argument('--window', type=float, default=10.0, help='Fenêtre d\'arrivée des employés (secondes)')
+    parser.add_argument('--think', type=float, default=0.0, help='Pause aléatoire maximale avant chaque pointage (s)')
+    parser.add_argument('--server', action='store_true', help='Passer par un serveur WSGI local (threads)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='load_shift_start.json')
+    parser.add_argument('--compare', help='Résultat JSON d\'une exécution précédente')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load.db')}")
+    # Hachage rapide : le test porte sur les pointages, pas sur le coût bcrypt
+    os.environ.setdefault('BCRYPT_ROUNDS', '10')
+
+    from src.main import create_app
+    app = create_app()
+    seed(app, args.employees)
+
+    server = None
+    if args.server:
+        from werkzeug.serving import make_server, WSGIRequestHandler
+        
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args):
+                pass
+        
+        server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+        make_client = lambda: HttpClient(base_url)
+    else:
+        make_client = lambda: InProcessClient(app)
+
+    # Heures d'arrivée réparties aléatoirement dans la fenêtre
+    arrivals = sorted((random.uniform(0, args.window), f'EMP{i:05d}') for i in range(args.employees))
+    recorder = Recorder()
+    started_at = datetime.now().isoformat(timespec='seconds')
+    started = time.perf_counter()
+
+    def arrive(arrival):
+        offset, number = arrival
+        delay = offset - (time.perf_counter() - started)
+        if delay > 0:
+            time.sleep(delay)
+        employee_day(make_client(), number, recorder, args.think)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(arrive, arrivals))
+    elapsed = time.perf_counter() - started
+
+    if server:
+        server.shutdown()
+
+    operations = recorder.report()
+    requests = sum(stats['count'] for stats in operations.values())
+    result = {
+        'meta': {
+            'commit': git_commit(),
+            'started_at': started_at,
+            'mode': 'server' if args.server else 'inprocess',
+            'employees': args.employees,
+            'concurrency': args.concurrency,
+            'window_s': args.window,
+            'think_s': args.think,
+            'sqlite_profile': app.config.get('SQLITE_PROFILE'),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count()
+        },
+        'totals': {
+            'duration_s': round(elapsed, 2),
+            'requests': requests,
+            'throughput_rps': round(requests / elapsed, 1),
+            'error_rate': round(sum(stats['error_rate'] * stats['count'] for stats in operations.values()) / requests, 4),
+            'lock_timeouts': sum(stats['lock_timeouts'] for stats in operations.values())
+        },
+        'operations': operations
+    }
+
+    for operation, stats in operations.items():
+        print(f"{operation:<22} n={stats['count']:<6} p50={stats['p50_ms']:7.1f}ms p95={stats['p95_ms']:7.1f}ms "
+              f"p99={stats['p99_ms']:7.1f}ms erreurs={stats['error_rate']:.2%} verrous={stats['lock_timeouts']}")
+    totals = result['totals']
+    print(f"total: {totals['requests']} requêtes en {totals['duration_s']}s ({totals['throughput_rps']}/s), "
+          f"erreurs {totals['error_rate']:.2%}, délais de verrou {totals['lock_timeouts']}")
+
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(result, output, indent=2)
+    print(f"✅ Résultats écrits dans {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as source:
+            compare(result, json.load(source))
+
+if __name__ == '__main__':
+    main()
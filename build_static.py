@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Script de build des fichiers statiques du frontend
+
+Écrit les variantes précompressées (.gz, et .br si le module `brotli` est
+installé) et le manifeste static/.static-manifest.json lu au démarrage.
+À relancer après chaque build du frontend :
+
+    python build_static.py
+    python build_static.py --static-folder chemin/vers/static
+"""
+import argparse
+import os
+import sys
+
+# Ajouter le répertoire courant au path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.static_files import build_manifest, MANIFEST_NAME
+
+def main():
+    parser = argparse.ArgumentParser(description='Précompresser les fichiers statiques et écrire le manifeste')
+    parser.add_argument('--static-folder', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
+    args = parser.parse_args()
+
+    manifest = build_manifest(args.static_folder)
+
+    for path, entry in manifest['files'].items():
+        variants = ', '.join(f"{encoding} {variant['size']:,} o" for encoding, variant in entry['encodings'].items())
+        print(f"   {path} ({entry['size']:,} o){' -> ' + variants if variants else ''}")
+    print(f"✅ {len(manifest['files'])} fichier(s) dans {os.path.join(args.static_folder, MANIFEST_NAME)}")
+
+if __name__ == '__main__':
+    main()
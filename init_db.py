@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Script d'initialisation de la base (schéma, mises à niveau, administrateur)
+
+À lancer au déploiement lorsque l'application tourne avec APP_INIT=lazy :
+
+    python init_db.py                # schéma + administrateur ADMIN001
+    python init_db.py --skip-admin   # schéma uniquement
+    python init_db.py --status       # migrations appliquées / en attente
+"""
+import argparse
+import os
+import sys
+
+# Ajouter le répertoire courant au path
+sys.path.insert(0, os.path.dirname(__file__))
+
+# L'initialisation est faite explicitement ci-dessous
+os.environ['APP_INIT'] = 'lazy'
+
+from src.main import create_app
+from src.database import initialize_database
+from src.migrations import migration_status
+
+def main():
+    parser = argparse.ArgumentParser(description='Initialiser la base de données')
+    parser.add_argument('--skip-admin', action='store_true', help='Ne pas créer l\'administrateur par défaut')
+    parser.add_argument('--status', action='store_true', help='Afficher l\'état des migrations sans rien modifier')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        if args.status:
+            for version, name, applied_at in migration_status():
+                state = f"appliquée le {applied_at:%Y-%m-%d %H:%M}" if applied_at else "en attente"
+                print(f"   {version:>3} {name:<24} {state}")
+            return
+
+        initialize_database(app, default_admin=not args.skip_admin)
+
+    print("✅ Base de données initialisée.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script de reconstruction des agrégats (journaliers, hebdomadaires, mensuels, de carrière) des pointages
+
+    python rebuild_rollups.py                      # tout reconstruire
+    python rebuild_rollups.py --start 2024-01-01   # à partir d'un mois
+    python rebuild_rollups.py --check              # vérifier sans modifier
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# Ajouter le répertoire courant au path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.main import create_app
+from src.models.employee import db
+from src.models.rollup import rebuild_totals, check_totals, check_weekly_totals, check_lifetime_totals
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def main():
+    parser = argparse.ArgumentParser(description='Reconstruire les agrégats de pointage')
+    parser.add_argument('--start', type=parse_date, help='Date de début (AAAA-MM-JJ)')
+    parser.add_argument('--end', type=parse_date, help='Date de fin (AAAA-MM-JJ)')
+    parser.add_argument('--employee', type=int, help='Identifiant d\'un employé')
+    parser.add_argument('--check', action='store_true', help='Vérifier la cohérence sans reconstruire')
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        if not args.check:
+            rebuild_totals(start_date=args.start, end_date=args.end, employee_id=args.employee)
+            db.session.commit()
+            print("✅ Agrégats reconstruits.")
+
+        mismatches = check_totals(start_date=args.start, end_date=args.end, employee_id=args.employee)
+        weekly_mismatches = check_weekly_totals(start_date=args.start, end_date=args.end, employee_id=args.employee)
+        lifetime_mismatches = check_lifetime_totals(employee_id=args.employee)
+        if mismatches or weekly_mismatches or lifetime_mismatches:
+            count = len(mismatches) + len(weekly_mismatches) + len(lifetime_mismatches)
+            print(f"❌ {count} écart(s) détecté(s) :")
+            for employee_id, month, expected, stored in mismatches:
+                print(f"   employé {employee_id} - {month}: attendu {expected[0]} j / {expected[1]:.2f} h, "
+                      f"stocké {stored[0]} j / {stored[1]:.2f} h")
+            for employee_id, week, expected, stored in weekly_mismatches:
+                print(f"   employé {employee_id} - semaine du {week}: attendu {expected[0]} j / {expected[1]:.2f} h, "
+                      f"stocké {stored[0]} j / {stored[1]:.2f} h")
+            for employee_id, expected, stored in lifetime_mismatches:
+                print(f"   employé {employee_id} - carrière : attendu {expected[0]} j / {expected[1]:.2f} h, "
+                      f"stocké {stored[0]} j / {stored[1]:.2f} h")
+            sys.exit(1)
+
+        print("✅ Agrégats cohérents avec les pointages.")
+
+if __name__ == '__main__':
+    main()
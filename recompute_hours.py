@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Script de recalcul en masse des heures stockées des pointages
+
+À lancer après un changement de règle de calcul ou une correction de données :
+
+    python recompute_hours.py                                   # tous les pointages
+    python recompute_hours.py --start 2024-01-01 --end 2024-12-31
+    python recompute_hours.py --employee 42 --batch-size 1000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+# Ajouter le répertoire courant au path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.main import create_app
+from src.maintenance import recompute_hours
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def main():
+    parser = argparse.ArgumentParser(description='Recalculer les heures des pointages')
+    parser.add_argument('--start', type=parse_date, help='Date de début (AAAA-MM-JJ)')
+    parser.add_argument('--end', type=parse_date, help='Date de fin (AAAA-MM-JJ)')
+    parser.add_argument('--employee', type=int, help='Identifiant d\'un employé')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Pointages par lot (défaut : 5000)')
+    args = parser.parse_args()
+
+    app = create_app()
+    started = time.perf_counter()
+
+    def report(done, total, changed):
+        elapsed = time.perf_counter() - started
+        print(f"   {done}/{total} ({done * 100 // total}%) - {changed} modifié(s) - {done / elapsed:,.0f} pointages/s",
+              flush=True)
+
+    with app.app_context():
+        changed = recompute_hours(start_date=args.start, end_date=args.end, employee_id=args.employee,
+                                  batch_size=args.batch_size, progress=report)
+
+    print(f"✅ {changed} pointage(s) recalculé(s) en {time.perf_counter() - started:.1f}s, agrégats reconstruits.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import importlib.util
+
+# pyarrow (dépendance optionnelle, ~40 ms d'import) n'est chargé qu'au premier export
+
+# Lignes par groupe (Parquet) ou par lot (Arrow), lues par bloc avec yield_per : mémoire bornée
+COLUMNAR_CHUNK_SIZE = 50000
+
+COLUMNAR_FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows')
+}
+
+# Types des colonnes de build_entries_query
+def _entries_schema(pa):
+    employee_field = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('date', pa.date32()),
+        ('employee_number', employee_field),
+        ('first_name', employee_field),
+        ('last_name', employee_field),
+        ('morning_in', pa.time64('us')),
+        ('lunch_out', pa.time64('us')),
+        ('lunch_in', pa.time64('us')),
+        ('evening_out', pa.time64('us')),
+        ('morning_hours', pa.float64()),
+        ('afternoon_hours', pa.float64()),
+        ('total_hours', pa.float64())
+    ])
+
+def columnar_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+class _ChunkSink:
+    """Fichier en écriture seule dont le contenu est repris par morceaux"""
+
+    def __init__(self):
+        self._chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _batch(pa, schema, rows):
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def iter_entries_columnar(query, format_type='parquet', chunk_size=COLUMNAR_CHUNK_SIZE):
+    """Générer l'export typé des pointages en Parquet ou en flux Arrow IPC.
+
+    Chaque bloc de `chunk_size` lignes lu par le curseur devient un groupe
+    de lignes Parquet (ou un lot Arrow) envoyé aussitôt : dates, heures et
+    durées gardent leur type, les champs employé sont encodés par dictionnaire.
+    """
+    import pyarrow as pa
+
+    schema = _entries_schema(pa)
+    sink = _ChunkSink()
+    output = pa.PythonFile(sink, mode='w')
+    if format_type == 'arrow':
+        writer = pa.ipc.new_stream(output, schema)
+    else:
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(output, schema, compression='zstd')
+
+    rows = []
+    for row in query.yield_per(chunk_size):
+        rows.append(tuple(row))
+        if len(rows) >= chunk_size:
+            writer.write_table(_batch(pa, schema, rows))
+            rows = []
+            yield sink.take()
+
+    if rows:
+        writer.write_table(_batch(pa, schema, rows))
+    writer.close()
+    yield sink.take()
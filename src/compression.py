@@ -0,0 +1,120 @@
+import zlib
+from functools import wraps
+from flask import request, current_app, make_response
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    zstandard = None
+
+# Réponses plus petites envoyées telles quelles (octets)
+COMPRESSION_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Types de contenu compressibles (Parquet et Arrow sont déjà compressés ou binaires)
+COMPRESSIBLE_MIMETYPES = ('text/csv', 'text/plain', 'application/json')
+
+
+class _GzipEncoder:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        # Vidage synchronisé : le client reçoit chaque bloc sans attendre la fin
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _ZstdEncoder:
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+def available_encodings():
+    """Encodages proposés, par ordre de préférence du serveur"""
+    return ['zstd', 'gzip'] if zstandard is not None else ['gzip']
+
+def _encoder(encoding, config):
+    if encoding == 'zstd':
+        return _ZstdEncoder(config.get('COMPRESSION_ZSTD_LEVEL', ZSTD_LEVEL))
+    return _GzipEncoder(config.get('COMPRESSION_GZIP_LEVEL', GZIP_LEVEL))
+
+def _compress_stream(chunks, encoder, source):
+    """Compresser un corps en flux, bloc par bloc, sans le garder en mémoire"""
+    try:
+        for chunk in chunks:
+            data = encoder.compress(chunk)
+            data += encoder.flush()
+            if data:
+                yield data
+        yield encoder.finish()
+    finally:
+        if hasattr(source, 'close'):
+            source.close()
+
+def compressed(f):
+    """Décorateur : compresser la réponse en gzip (ou zstd) selon Accept-Encoding.
+
+    Les corps en flux sont compressés au fil des blocs : seuls les premiers
+    octets sont lus d'avance pour écarter les réponses de moins de
+    COMPRESSION_MIN_SIZE octets, envoyées telles quelles.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        response = make_response(f(*args, **kwargs))
+        response.vary.add('Accept-Encoding')
+
+        config = current_app.config
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if (not encoding or response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        min_size = config.get('COMPRESSION_MIN_SIZE', COMPRESSION_MIN_SIZE)
+        if not response.is_streamed:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            encoder = _encoder(encoding, config)
+            response.set_data(encoder.compress(data) + encoder.finish())
+        else:
+            # Lire le début du flux jusqu'à COMPRESSION_MIN_SIZE octets
+            source = response.response
+            chunks = response.iter_encoded()
+            head, size = [], 0
+            for chunk in chunks:
+                head.append(chunk)
+                size += len(chunk)
+                if size >= min_size:
+                    break
+            else:
+                if hasattr(source, 'close'):
+                    source.close()
+                response.set_data(b''.join(head))
+                return response
+
+            def remaining():
+                yield b''.join(head)
+                yield from chunks
+
+            response.response = _compress_stream(remaining(), _encoder(encoding, config), source)
+            response.headers.pop('Content-Length', None)
+
+        response.headers['Content-Encoding'] = encoding
+        return response
+    return decorated_function
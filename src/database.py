@@ -0,0 +1,160 @@
+import os
+import random
+import threading
+import time
+from functools import wraps
+from flask import jsonify
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from src.models.employee import db
+from src.maintenance import ensure_default_admin
+from src.migrations import apply_migrations
+
+# Profils de connexion SQLite (PRAGMA appliqués à chaque nouvelle connexion)
+SQLITE_PROFILES = {
+    # Réglages par défaut de SQLite (journal rollback)
+    'default': {},
+    # Écritures concurrentes : WAL, fsync allégé, attente sur verrou
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,          # ms
+        'cache_size': -20000,          # ~20 Mo
+        'mmap_size': 268435456,        # 256 Mo
+        'temp_store': 'MEMORY'
+    }
+}
+
+# Nouvelles tentatives d'une requête d'écriture sur « database is locked » :
+# attente de verrou raccourcie à chaque tentative, ~3,5 s au pire en tout
+LOCK_RETRY_ATTEMPTS = 3
+LOCK_RETRY_BUSY_TIMEOUT = 1000  # ms, remplace busy_timeout pendant une tentative
+LOCK_RETRY_DELAY = 0.05  # secondes, doublé à chaque tentative
+
+def configure_database(app, database_path):
+    """Configurer SQLAlchemy et le profil SQLite de l'application.
+
+    DATABASE_URL remplace le chemin par défaut ; SQLITE_PROFILE (config ou
+    environnement) choisit le profil, SQLITE_PRAGMAS en surcharge des valeurs.
+    """
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', f'sqlite:///{database_path}')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.setdefault('SQLITE_PROFILE', os.environ.get('SQLITE_PROFILE', 'production'))
+    if app.config['SQLITE_PROFILE'] not in SQLITE_PROFILES:
+        raise ValueError(f"Profil SQLite inconnu : {app.config['SQLITE_PROFILE']!r} "
+                         f"(profils : {', '.join(SQLITE_PROFILES)})")
+
+    pragmas = dict(SQLITE_PROFILES[app.config['SQLITE_PROFILE']])
+    pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+
+    if 'busy_timeout' in pragmas:
+        # Le pilote sqlite3 attend aussi le verrou à l'ouverture de transaction
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {}).setdefault(
+            'connect_args', {'timeout': pragmas['busy_timeout'] / 1000}
+        )
+
+    db.init_app(app)
+
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        with app.app_context():
+            if pragmas:
+                event.listen(db.engine, 'connect', _pragma_listener(pragmas))
+            event.listen(db.engine, 'checkin', _restore_busy_timeout)
+
+def create_schema(app):
+    """Créer les tables manquantes puis appliquer les migrations en attente (src/migrations.py)"""
+    db.create_all()
+    apply_migrations(app)
+
+def initialize_database(app, default_admin=False):
+    """Schéma, mises à niveau et (si demandé) administrateur par défaut"""
+    create_schema(app)
+    if default_admin and ensure_default_admin():
+        app.logger.info('Administrateur par défaut ADMIN001 créé')
+
+def init_database(app, default_admin=False):
+    """Préparer la base au démarrage selon APP_INIT (config ou environnement).
+
+    eager (défaut) : initialize_database() à la création de l'application.
+    lazy : aucune requête SQL au démarrage (démarrage à froid serverless) ;
+    le schéma est créé par init_db.py lors du déploiement, la première
+    requête d'un processus ne l'initialise que si la base est vide.
+    """
+    app.config.setdefault('APP_INIT', os.environ.get('APP_INIT', 'eager'))
+    
+    if app.config['APP_INIT'] != 'lazy':
+        with app.app_context():
+            initialize_database(app, default_admin)
+        return
+    
+    lock = threading.Lock()
+    state = {'checked': False}
+    
+    @app.before_request
+    def initialize_empty_database():
+        if state['checked']:
+            return
+        with lock:
+            if not state['checked']:
+                exists = db.session.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'employee'")
+                ).first()
+                if not exists:
+                    initialize_database(app, default_admin)
+                state['checked'] = True
+
+def _pragma_listener(pragmas):
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+    return set_sqlite_pragmas
+
+def _restore_busy_timeout(dbapi_connection, connection_record):
+    # Attente de verrou réduite par retry_on_lock : valeur d'origine pour la requête suivante
+    busy_timeout = connection_record.info.pop('restore_busy_timeout', None)
+    if busy_timeout is not None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA busy_timeout={busy_timeout}')
+        cursor.close()
+
+def _limit_busy_timeout(milliseconds):
+    """Réduire l'attente de verrou de la connexion de la session jusqu'à son retour au pool"""
+    connection = db.session.connection()
+    if 'restore_busy_timeout' not in connection.info:
+        connection.info['restore_busy_timeout'] = connection.exec_driver_sql('PRAGMA busy_timeout').scalar()
+    connection.exec_driver_sql(f'PRAGMA busy_timeout={milliseconds}')
+
+def is_database_locked(error):
+    """Vrai si l'erreur vient d'un verrou SQLite (écriture concurrente)"""
+    return isinstance(error, OperationalError) and (
+        'database is locked' in str(error) or 'database table is locked' in str(error)
+    )
+
+def retry_on_lock(f):
+    """Décorateur : rejouer une requête d'écriture en cas de verrou SQLite.
+
+    La vue doit relancer les erreurs de verrou (voir is_database_locked) ;
+    chaque tentative attend le verrou au plus LOCK_RETRY_BUSY_TIMEOUT ms
+    (au lieu du busy_timeout du profil) et, après LOCK_RETRY_ATTEMPTS
+    tentatives, la requête répond 503 avec Retry-After.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        delay = LOCK_RETRY_DELAY
+        for attempt in range(LOCK_RETRY_ATTEMPTS):
+            try:
+                _limit_busy_timeout(LOCK_RETRY_BUSY_TIMEOUT)
+                return f(*args, **kwargs)
+            except OperationalError as e:
+                db.session.rollback()
+                if not is_database_locked(e):
+                    raise
+                time.sleep(delay * (1 + random.random()))
+                delay *= 2
+
+        response = jsonify({'error': 'Base de données occupée, veuillez réessayer'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    return decorated_function
@@ -3,16 +3,24 @@ import sys
 # Ajouter le répertoire parent au path pour les imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 from src.models.employee import db
+from src.database import configure_database, init_database
 from src.routes.auth import auth_bp
 from src.routes.employee import employee_bp
 from src.routes.timeentry import timeentry_bp
 from src.routes.export import export_bp
+from src.routes.overtime import overtime_bp
+from src.routes.metrics import metrics_bp
+from src.metrics import init_metrics
+from src.slow_queries import init_slow_query_log
+from src.static_files import register_static_routes
 
 def create_app():
-    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), '..', 'static'))
+    # Les fichiers statiques sont servis par register_static_routes (manifeste précompressé)
+    app = Flask(__name__, static_folder=None)
+    static_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'static'))
     
     # Configuration
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'pointeuse_secret_key_2024_secure')
@@ -24,44 +32,57 @@ def create_app():
     app.config['SESSION_COOKIE_HTTPONLY'] = True
     app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
     
-    # Configuration de la base de données
-    database_path = os.path.join(os.path.dirname(__file__), '..', 'database', 'app.db')
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{database_path}"
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Jeton des badgeuses pour l'envoi groupé de pointages (désactivé si absent)
+    app.config['TERMINAL_TOKEN'] = os.environ.get('TERMINAL_TOKEN')
+    
+    # Métriques par endpoint (/metrics) ; jeton optionnel pour le scraper Prometheus
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') != '0'
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    
+    # Seuil (ms) du journal des requêtes SQL lentes, 0 pour le désactiver
+    app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', 200))
+    
+    # Exports en tâche de fond (?async=1) : threads, durée de conservation (s), dossier des fichiers
+    app.config['EXPORT_JOB_WORKERS'] = int(os.environ.get('EXPORT_JOB_WORKERS', 2))
+    app.config['EXPORT_JOB_TTL'] = int(os.environ.get('EXPORT_JOB_TTL', 3600))
+    app.config['EXPORT_JOB_DIR'] = os.environ.get('EXPORT_JOB_DIR')
+    app.config['EXPORT_JOB_MAX_PENDING'] = int(os.environ.get('EXPORT_JOB_MAX_PENDING', 10))
+    
+    # Compression gzip/zstd des exports CSV et des listes JSON : taille minimale (octets) et niveaux
+    app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    app.config['COMPRESSION_GZIP_LEVEL'] = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    app.config['COMPRESSION_ZSTD_LEVEL'] = int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3))
+    
+    # Dossier des archives annuelles de pointages (archive_entries.py) ; défaut : archive/ à côté de la base
+    app.config['ARCHIVE_DIR'] = os.environ.get('ARCHIVE_DIR')
+
+    # Paliers d'heures supplémentaires hebdomadaires (seuil:majoration %, ex. 39:25,43:50)
+    app.config['OVERTIME_TIERS'] = os.environ.get('OVERTIME_TIERS', '35:25,43:50')
     
     # Configuration CORS
     CORS(app, supports_credentials=True)
     
-    # Initialisation de la base de données
-    db.init_app(app)
+    # Initialisation de la base de données (profil SQLite : SQLITE_PROFILE)
+    database_path = os.path.join(os.path.dirname(__file__), '..', 'database', 'app.db')
+    configure_database(app, database_path)
+    init_metrics(app)
+    init_slow_query_log(app)
     
     # Enregistrement des blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(employee_bp, url_prefix='/api')
     app.register_blueprint(timeentry_bp, url_prefix='/api')
     app.register_blueprint(export_bp, url_prefix='/api')
+    app.register_blueprint(overtime_bp, url_prefix='/api')
+    app.register_blueprint(metrics_bp)
     
-    # Création des tables
-    with app.app_context():
-        # Créer le dossier database s'il n'existe pas
-        os.makedirs(os.path.dirname(database_path), exist_ok=True)
-        db.create_all()
+    # Création des tables (au démarrage, ou par init_db.py si APP_INIT=lazy)
+    # Créer le dossier database s'il n'existe pas
+    os.makedirs(os.path.dirname(database_path), exist_ok=True)
+    init_database(app)
     
-    @app.route('/', defaults={'path': ''})
-    @app.route('/<path:path>')
-    def serve(path):
-        static_folder_path = app.static_folder
-        if static_folder_path is None:
-            return "Static folder not configured", 404
-
-        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-            return send_from_directory(static_folder_path, path)
-        else:
-            index_path = os.path.join(static_folder_path, 'index.html')
-            if os.path.exists(index_path):
-                return send_from_directory(static_folder_path, 'index.html')
-            else:
-                return "index.html not found", 404
+    # Frontend : fichiers statiques et index.html pour le routing côté client
+    register_static_routes(app, static_folder)
     
     return app
 
@@ -0,0 +1,114 @@
+from datetime import datetime
+from sqlalchemy import func, or_, text
+from src.models.employee import db, Employee, TimeEntry, PUNCH_TYPES, PERIODS, hours_between_sql
+from src.models.rollup import rebuild_totals
+from src.passwords import hash_password
+
+def merge_duplicate_entries():
+    """Fusionner les pointages en double (même employé, même jour).
+
+    La ligne d'id le plus petit est conservée ; chaque créneau y prend la
+    première heure pointée parmi les doublons. Retourne le nombre de lignes
+    supprimées. Ne commit pas.
+    """
+    groups = db.session.query(TimeEntry.employee_id, TimeEntry.date)\
+                       .group_by(TimeEntry.employee_id, TimeEntry.date)\
+                       .having(func.count(TimeEntry.id) > 1).all()
+
+    removed = 0
+    for employee_id, day in groups:
+        entries = TimeEntry.query.filter_by(employee_id=employee_id, date=day).order_by(TimeEntry.id).all()
+        kept = entries[0]
+        for punch_type in PUNCH_TYPES:
+            values = [getattr(entry, punch_type) for entry in entries if getattr(entry, punch_type)]
+            setattr(kept, punch_type, min(values) if values else None)
+        kept.calculate_hours()
+
+        for duplicate in entries[1:]:
+            db.session.delete(duplicate)
+            removed += 1
+        db.session.flush()
+        rebuild_totals(start_date=day, end_date=day, employee_id=employee_id)
+
+    return removed
+
+def ensure_unique_entry_index():
+    """Rendre idx_employee_date unique sur une base créée avant la contrainte.
+
+    Les doublons existants sont d'abord fusionnés. Retourne le nombre de
+    lignes fusionnées, ou None si l'index était déjà unique.
+    """
+    indexes = db.session.execute(text("PRAGMA index_list('time_entry')")).all()
+    if any(index.name == 'idx_employee_date' and index.unique for index in indexes):
+        return None
+
+    removed = merge_duplicate_entries()
+    db.session.execute(text('DROP INDEX IF EXISTS idx_employee_date'))
+    db.session.execute(text('CREATE UNIQUE INDEX idx_employee_date ON time_entry (employee_id, date)'))
+    db.session.commit()
+    return removed
+
+def recompute_hours(start_date=None, end_date=None, employee_id=None, batch_size=5000, progress=None):
+    """Recalculer morning_hours/afternoon_hours/total_hours en SQL, par lots.
+
+    Chaque lot est un UPDATE ensembliste sur une plage d'id, validé
+    séparément ; seules les lignes dont les heures changent sont écrites
+    (et leur updated_at avancé). Les agrégats de la période sont ensuite
+    reconstruits. `progress(lignes_traitées, total, lignes_modifiées)` est
+    appelé après chaque lot. Retourne le nombre de lignes modifiées.
+    """
+    table = TimeEntry.__table__
+    filters = []
+    if start_date:
+        filters.append(table.c.date >= start_date)
+    if end_date:
+        filters.append(table.c.date <= end_date)
+    if employee_id:
+        filters.append(table.c.employee_id == employee_id)
+
+    bounds = db.session.query(func.min(table.c.id), func.max(table.c.id), func.count(table.c.id))\
+                       .filter(*filters).one()
+    first_id, last_id, total = bounds
+    if not total:
+        return 0
+
+    new_values = {hours: hours_between_sql(table.c[start], table.c[end]) for start, end, hours in PERIODS}
+    new_values['total_hours'] = new_values['morning_hours'] + new_values['afternoon_hours']
+    changed_filter = or_(*[
+        or_(table.c[column].is_(None), func.abs(table.c[column] - value) > 1e-9)
+        for column, value in new_values.items()
+    ])
+
+    done = 0
+    changed = 0
+    for low in range(first_id, last_id + 1, batch_size):
+        batch = [table.c.id >= low, table.c.id < low + batch_size] + filters
+        result = db.session.execute(
+            db.update(table).where(*batch, changed_filter).values(updated_at=datetime.utcnow(), **new_values)
+        )
+        changed += result.rowcount
+        done += db.session.query(func.count(table.c.id)).filter(*batch).scalar()
+        db.session.commit()
+        if progress:
+            progress(done, total, changed)
+
+    rebuild_totals(start_date=start_date, end_date=end_date, employee_id=employee_id)
+    db.session.commit()
+    return changed
+
+def ensure_default_admin():
+    """Créer l'administrateur par défaut ADMIN001 s'il n'existe pas. Retourne True s'il a été créé."""
+    if Employee.query.filter_by(employee_number='ADMIN001').first():
+        return False
+    
+    db.session.add(Employee(
+        employee_number='ADMIN001',
+        first_name='Administrateur',
+        last_name='Système',
+        email='admin@pointeuse.local',
+        password_hash=hash_password('admin123'),
+        is_admin=True,
+        is_active=True
+    ))
+    db.session.commit()
+    return True
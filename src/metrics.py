@@ -0,0 +1,153 @@
+import threading
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from src.models.employee import db
+
+# Bornes (secondes) de l'histogramme des latences
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class RequestMetrics:
+    """Compteurs par endpoint (par processus) : latences, tailles de réponse, requêtes SQL.
+
+    L'enregistrement d'une requête ne fait que quelques additions sous
+    verrou ; le texte Prometheus n'est produit qu'au moment du scrape.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._latency = {}    # (endpoint, méthode) -> [compteurs par borne..., somme, nombre]
+        self._requests = {}   # (endpoint, méthode, statut) -> nombre
+        self._sizes = {}      # endpoint -> [octets, réponses de taille connue]
+        self._sql = {}        # endpoint -> [instructions, durée]
+
+    def record(self, endpoint, method, status, elapsed, size, sql_count, sql_time):
+        with self._lock:
+            latency = self._latency.get((endpoint, method))
+            if latency is None:
+                latency = self._latency[(endpoint, method)] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if elapsed <= bound:
+                    latency[index] += 1
+            latency[-2] += elapsed
+            latency[-1] += 1
+
+            key = (endpoint, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+            if size is not None:
+                sizes = self._sizes.setdefault(endpoint, [0, 0])
+                sizes[0] += size
+                sizes[1] += 1
+
+            sql = self._sql.setdefault(endpoint, [0, 0.0])
+            sql[0] += sql_count
+            sql[1] += sql_time
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._requests.clear()
+            self._sizes.clear()
+            self._sql.clear()
+
+    def render(self):
+        """Métriques au format texte Prometheus (version 0.0.4)"""
+        with self._lock:
+            latency = {key: list(values) for key, values in self._latency.items()}
+            requests = dict(self._requests)
+            sizes = {key: list(values) for key, values in self._sizes.items()}
+            sql = {key: list(values) for key, values in self._sql.items()}
+
+        lines = [
+            '# HELP pointeuse_http_requests_total Requêtes HTTP traitées',
+            '# TYPE pointeuse_http_requests_total counter'
+        ]
+        for (endpoint, method, status), count in sorted(requests.items()):
+            lines.append(f'pointeuse_http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}')
+
+        lines += [
+            '# HELP pointeuse_http_request_duration_seconds Durée de traitement des requêtes HTTP',
+            '# TYPE pointeuse_http_request_duration_seconds histogram'
+        ]
+        for (endpoint, method), values in sorted(latency.items()):
+            for bound, count in zip(self.buckets, values):
+                lines.append('pointeuse_http_request_duration_seconds_bucket'
+                             f'{_labels(endpoint=endpoint, method=method, le=bound)} {count}')
+            lines.append('pointeuse_http_request_duration_seconds_bucket'
+                         f'{_labels(endpoint=endpoint, method=method, le="+Inf")} {values[-1]}')
+            labels = _labels(endpoint=endpoint, method=method)
+            lines.append(f'pointeuse_http_request_duration_seconds_sum{labels} {values[-2]:.6f}')
+            lines.append(f'pointeuse_http_request_duration_seconds_count{labels} {values[-1]}')
+
+        lines += [
+            '# HELP pointeuse_http_response_size_bytes Taille des réponses HTTP (hors flux)',
+            '# TYPE pointeuse_http_response_size_bytes summary'
+        ]
+        for endpoint, (total, count) in sorted(sizes.items()):
+            lines.append(f'pointeuse_http_response_size_bytes_sum{_labels(endpoint=endpoint)} {total}')
+            lines.append(f'pointeuse_http_response_size_bytes_count{_labels(endpoint=endpoint)} {count}')
+
+        lines += [
+            '# HELP pointeuse_sql_statements_total Instructions SQL exécutées pendant les requêtes',
+            '# TYPE pointeuse_sql_statements_total counter'
+        ]
+        for endpoint, (count, _) in sorted(sql.items()):
+            lines.append(f'pointeuse_sql_statements_total{_labels(endpoint=endpoint)} {count}')
+
+        lines += [
+            '# HELP pointeuse_sql_duration_seconds_total Durée cumulée des instructions SQL',
+            '# TYPE pointeuse_sql_duration_seconds_total counter'
+        ]
+        for endpoint, (_, elapsed) in sorted(sql.items()):
+            lines.append(f'pointeuse_sql_duration_seconds_total{_labels(endpoint=endpoint)} {elapsed:.6f}')
+
+        return '\n'.join(lines) + '\n'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+request_metrics = RequestMetrics()
+
+def init_metrics(app):
+    """Mesurer chaque requête (latence, taille, SQL) ; désactivé si METRICS_ENABLED est faux"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.sql_count = 0
+        g.sql_time = 0.0
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            request_metrics.record(
+                request.endpoint or 'unmatched',
+                request.method,
+                response.status_code,
+                time.perf_counter() - started,
+                None if response.is_streamed else response.calculate_content_length(),
+                g.get('sql_count', 0),
+                g.get('sql_time', 0.0)
+            )
+        return response
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info['metrics_started'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'sql_count' in g:
+            g.sql_count += 1
+            g.sql_time += time.perf_counter() - conn.info.pop('metrics_started', time.perf_counter())
@@ -0,0 +1,130 @@
+from datetime import datetime
+from sqlalchemy import inspect, select, text
+from sqlalchemy.dialects.sqlite import insert
+from src.models.employee import db, Employee, TimeEntry
+from src.models.rollup import (DailyTotal, MonthlyTotal, rebuild_totals, rebuild_lifetime_totals,
+                               rebuild_weekly_totals, totals_complete)
+from src.maintenance import ensure_unique_entry_index
+from src.models.search import setup_employee_search
+
+class SchemaMigration(db.Model):
+    """Migration de schéma appliquée à la base"""
+    __tablename__ = 'schema_migration'
+
+    version = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SchemaMigration {self.version} {self.name}>'
+
+
+# (version, nom, fonction(app)) par version croissante
+MIGRATIONS = []
+
+def migration(version, name):
+    """Décorateur : enregistrer une migration.
+
+    db.create_all() ne crée que les tables manquantes : toute modification
+    d'une table existante (index, colonne, trigger) passe par une migration,
+    écrite pour pouvoir être rejouée sans effet sur une base déjà à jour.
+    """
+    def decorator(f):
+        MIGRATIONS.append((version, name, f))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return f
+    return decorator
+
+def backfill_totals(app):
+    """Reconstruire tous les agrégats depuis time_entry (et les archives) s'ils ne couvrent
+    pas tous les pointages, cas d'une base antérieure aux agrégats. Vrai si reconstruits.
+    """
+    if totals_complete():
+        return False
+    rebuild_totals()
+    db.session.commit()
+    app.logger.info('Agrégats de pointage reconstruits depuis l\'historique')
+    return True
+
+@migration(1, 'unique_entry_index')
+def unique_entry_index(app):
+    merged = ensure_unique_entry_index()
+    if merged is not None:
+        app.logger.info('Index unique (employee_id, date) créé, %d pointage(s) en double fusionné(s)', merged)
+
+@migration(2, 'employee_search')
+def employee_search(app):
+    if not setup_employee_search():
+        app.logger.warning('FTS5 indisponible : recherche des employés en ILIKE')
+
+@migration(3, 'covering_indexes')
+def covering_indexes(app):
+    """Index des formes de requête relevées par benchmarks/index_advisor.py.
+
+    - time_entry (date, employee_id) remplace (date) : liste et exports triés par date ;
+    - employee (last_name, first_name) : listes triées par nom, rapports sur les actifs ;
+    - agrégats journaliers et mensuels par date/mois, couvrants pour les rapports.
+    """
+    connection = db.session.connection()
+    db.session.execute(text('DROP INDEX IF EXISTS idx_date'))
+    for model, name in ((TimeEntry, 'idx_date_employee'),
+                        (Employee, 'idx_employee_name'),
+                        (DailyTotal, 'idx_daily_total_date'),
+                        (MonthlyTotal, 'idx_monthly_total_month')):
+        index = next(index for index in model.__table__.indexes if index.name == name)
+        index.create(connection, checkfirst=True)
+    # Statistiques de l'optimiseur pour les nouveaux index
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+@migration(4, 'lifetime_totals')
+def lifetime_totals(app):
+    """Remplir employee_lifetime_total depuis les agrégats mensuels existants.
+
+    Sur une base dont l'historique n'est pas encore agrégé, tous les
+    agrégats (carrière compris) sont d'abord reconstruits depuis time_entry.
+    """
+    if backfill_totals(app):
+        return
+    rebuild_lifetime_totals()
+    db.session.commit()
+
+@migration(5, 'weekly_totals')
+def weekly_totals(app):
+    """Remplir employee_weekly_total depuis les agrégats journaliers existants
+    (reconstruits d'abord depuis time_entry s'ils ne couvrent pas l'historique)
+    """
+    if backfill_totals(app):
+        return
+    rebuild_weekly_totals()
+    db.session.commit()
+
+@migration(6, 'rollup_backfill')
+def rollup_backfill(app):
+    """Agréger l'historique des bases dont les tables d'agrégats ont été créées vides"""
+    backfill_totals(app)
+
+def migration_status():
+    """(version, nom, date d'application ou None) de chaque migration connue"""
+    applied = {}
+    # Base antérieure aux migrations : table schema_migration pas encore créée
+    if inspect(db.session.connection()).has_table(SchemaMigration.__tablename__):
+        applied = dict(db.session.execute(select(SchemaMigration.version, SchemaMigration.applied_at)).all())
+    return [(version, name, applied.get(version)) for version, name, _ in MIGRATIONS]
+
+def apply_migrations(app):
+    """Appliquer dans l'ordre les migrations non encore appliquées. Retourne leurs versions."""
+    done = {version for version, _, applied_at in migration_status() if applied_at}
+    applied = []
+    for version, name, upgrade in MIGRATIONS:
+        if version in done:
+            continue
+        upgrade(app)
+        # Deux processus démarrant ensemble peuvent appliquer la même migration
+        db.session.execute(insert(SchemaMigration).values(
+            version=version, name=name, applied_at=datetime.utcnow()
+        ).on_conflict_do_nothing())
+        db.session.commit()
+        app.logger.info('Migration %d (%s) appliquée', version, name)
+        applied.append(version)
+    return applied
@@ -0,0 +1,272 @@
+import os
+import sqlite3
+from collections import OrderedDict
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy import Column, Index, MetaData, Table, and_, func, select, tuple_, union_all
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import aliased
+from src.models.employee import db, TimeEntry
+
+# SQLite attache au plus 10 bases par connexion (SQLITE_MAX_ATTACHED)
+MAX_ATTACHED_ARCHIVES = 10
+
+class ArchivePartition(db.Model):
+    """Année de pointages déplacée dans un fichier SQLite d'archive"""
+    __tablename__ = 'time_entry_archive'
+
+    year = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    entries = db.Column(db.Integer, default=0, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ArchivePartition {self.year}>'
+
+
+def archive_schema(year):
+    """Nom sous lequel le fichier d'archive de `year` est attaché"""
+    return f'archive_{year}'
+
+def archive_filename(year):
+    return f'time_entry_{year}.db'
+
+def archive_directory():
+    """ARCHIVE_DIR (config), sinon dossier archive/ à côté de la base principale"""
+    directory = current_app.config.get('ARCHIVE_DIR')
+    if not directory:
+        directory = os.path.join(os.path.dirname(os.path.abspath(db.engine.url.database)), 'archive')
+    return directory
+
+_archive_tables = {}
+
+def archive_table(year):
+    """Table time_entry du fichier d'archive de `year`.
+
+    Mêmes colonnes que time_entry, sans clé étrangère (autre fichier) ;
+    la clé d'unicité est (employee_id, date), id n'est qu'une colonne.
+    """
+    table = _archive_tables.get(year)
+    if table is None:
+        table = Table(
+            TimeEntry.__tablename__, MetaData(),
+            *[Column(column.name, column.type, nullable=column.nullable) for column in TimeEntry.__table__.c],
+            schema=archive_schema(year)
+        )
+        Index('idx_employee_date', table.c.employee_id, table.c.date, unique=True)
+        Index('idx_date_employee', table.c.date, table.c.employee_id)
+        _archive_tables[year] = table
+    return table
+
+# Tables temporaires de lignes d'archive gardées par connexion (au-delà de MAX_ATTACHED_ARCHIVES)
+MAX_SPILL_TABLES = 4
+
+def spill_table(name):
+    """Table temporaire (propre à la connexion) des lignes d'archive d'une période"""
+    table = Table(
+        name, MetaData(),
+        *[Column(column.name, column.type, nullable=column.nullable) for column in TimeEntry.__table__.c],
+        schema='temp'
+    )
+    Index(f'{name}_date', table.c.date, table.c.employee_id)
+    Index(f'{name}_employee', table.c.employee_id, table.c.date)
+    return table
+
+def archived_partitions(start_date=None, end_date=None):
+    """(année, fichier) des années archivées recoupant la période"""
+    query = select(ArchivePartition.year, ArchivePartition.filename).order_by(ArchivePartition.year)
+    if start_date:
+        query = query.where(ArchivePartition.year >= start_date.year)
+    if end_date:
+        query = query.where(ArchivePartition.year <= end_date.year)
+    return db.session.execute(query).all()
+
+def _attach(connection, year, path):
+    attached = connection.info.setdefault('attached_archives', set())
+    if year not in attached:
+        connection.exec_driver_sql(f'ATTACH DATABASE ? AS {archive_schema(year)}', (path,))
+        attached.add(year)
+
+def _make_room(connection, keep):
+    """Détacher les archives hors de `keep` si la connexion ne peut plus en attacher toutes"""
+    attached = connection.info.setdefault('attached_archives', set())
+    if len(attached | set(keep)) > MAX_ATTACHED_ARCHIVES:
+        for year in attached - set(keep):
+            connection.exec_driver_sql(f'DETACH DATABASE {archive_schema(year)}')
+            attached.discard(year)
+
+def attach_partitions(partitions):
+    """Attacher à la connexion de la session les fichiers des années `partitions`.
+
+    Les fichiers restent attachés à la connexion (réutilisée par le pool) ;
+    au-delà de MAX_ATTACHED_ARCHIVES, ceux qui ne servent pas sont détachés.
+    """
+    connection = db.session.connection()
+    attached = connection.info.setdefault('attached_archives', set())
+    wanted = {year for year, _ in partitions}
+    if len(wanted) > MAX_ATTACHED_ARCHIVES:
+        # entries_source() lit les périodes plus longues par lots
+        raise ValueError(f'{len(wanted)} années archivées à attacher (au plus {MAX_ATTACHED_ARCHIVES})')
+    _make_room(connection, wanted)
+
+    directory = archive_directory()
+    for year, filename in partitions:
+        path = os.path.join(directory, filename)
+        if year not in attached and not os.path.exists(path):
+            # ATTACH créerait une base vide : l'année disparaîtrait sans erreur
+            raise FileNotFoundError(f'Archive {year} introuvable : {path}')
+        _attach(connection, year, path)
+
+def _partition_filter(table, start_date, end_date, employee_id):
+    conditions = []
+    if start_date:
+        conditions.append(table.c.date >= start_date)
+    if end_date:
+        conditions.append(table.c.date <= end_date)
+    if employee_id:
+        conditions.append(table.c.employee_id == employee_id)
+    return and_(*conditions)
+
+def _drop_spill(connection, table):
+    connection.exec_driver_sql(f'DROP TABLE IF EXISTS temp.{table.name}')
+
+def _spill_partitions(partitions, start_date, end_date, employee_id, chunk_size=1000):
+    """Table temporaire des lignes de `partitions` utiles à la période et à l'employé.
+
+    Chaque fichier est lu par sa propre connexion en lecture seule : une
+    base attachée et lue dans la transaction en cours ne peut plus être
+    détachée, ce qui limiterait une requête à MAX_ATTACHED_ARCHIVES années.
+    La table remplie est gardée sur la connexion (les archives ne changent
+    plus) : les pages suivantes d'une même liste la relisent sans recopie.
+    Remplie au milieu d'une transaction d'écriture, elle n'est pas gardée.
+    """
+    connection = db.session.connection()
+    spills = connection.info.setdefault('archive_spills', OrderedDict())
+    for table in connection.info.pop('archive_spills_once', []):
+        _drop_spill(connection, table)
+
+    years = [year for year, _ in partitions]
+    # Une année réarchivée (archived_at changé) invalide les tables qui la contiennent
+    stamps = tuple(db.session.execute(
+        select(ArchivePartition.year, ArchivePartition.archived_at)
+        .where(ArchivePartition.year.in_(years)).order_by(ArchivePartition.year)
+    ).all())
+    key = (stamps, start_date, end_date, employee_id)
+    table = spills.get(key)
+    if table is not None:
+        spills.move_to_end(key)
+        return table
+
+    sequence = connection.info['archive_spill_sequence'] = connection.info.get('archive_spill_sequence', 0) + 1
+    table = spill_table(f'archived_time_entry_{sequence}')
+    table.create(connection)
+
+    columns = ', '.join(column.name for column in table.c)
+    conditions, parameters = [], []
+    if start_date:
+        conditions.append('date >= ?')
+        parameters.append(start_date.isoformat())
+    if end_date:
+        conditions.append('date <= ?')
+        parameters.append(end_date.isoformat())
+    if employee_id:
+        conditions.append('employee_id = ?')
+        parameters.append(employee_id)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+    insert_sql = f"INSERT INTO temp.{table.name} ({columns}) VALUES ({', '.join('?' for _ in table.c)})"
+
+    dbapi_connection = connection.connection.dbapi_connection
+    in_transaction = dbapi_connection.in_transaction
+    directory = archive_directory()
+    for year, filename in partitions:
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f'Archive {year} introuvable : {path}')
+        source = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            cursor = source.execute(f'SELECT {columns} FROM {TimeEntry.__tablename__}{where}', parameters)
+            while rows := cursor.fetchmany(chunk_size):
+                dbapi_connection.executemany(insert_sql, rows)
+        finally:
+            source.close()
+
+    if in_transaction:
+        # Valider ici validerait aussi les écritures de l'appelant : table à usage unique
+        connection.info.setdefault('archive_spills_once', []).append(table)
+        return table
+
+    # Seule la table temporaire a été écrite : la valider la garde pour les requêtes suivantes
+    dbapi_connection.commit()
+    spills[key] = table
+    while len(spills) > MAX_SPILL_TABLES:
+        _, evicted = spills.popitem(last=False)
+        _drop_spill(connection, evicted)
+    return table
+
+def entries_source(start_date=None, end_date=None, employee_id=None):
+    """Entité à interroger à la place de TimeEntry : base principale et archives.
+
+    Sans année archivée dans la période, c'est TimeEntry lui-même (requête
+    inchangée). Sinon les archives concernées sont attachées et lues avec
+    la table principale dans un UNION ALL dont chaque branche reçoit les
+    filtres de période et d'employé. Au-delà de MAX_ATTACHED_ARCHIVES
+    années, les lignes filtrées des archives sont d'abord copiées par lots
+    dans une table temporaire, lue à leur place. S'utilise comme TimeEntry
+    (source.date, source.employee_id...).
+    """
+    partitions = archived_partitions(start_date, end_date)
+    if not partitions:
+        return TimeEntry
+
+    if len(partitions) > MAX_ATTACHED_ARCHIVES:
+        archived = [_spill_partitions(partitions, start_date, end_date, employee_id)]
+    else:
+        attach_partitions(partitions)
+        archived = [archive_table(year) for year, _ in partitions]
+    branches = [
+        select(*table.c).where(_partition_filter(table, start_date, end_date, employee_id))
+        for table in [TimeEntry.__table__] + archived
+    ]
+    return aliased(TimeEntry, union_all(*branches).subquery('time_entries'))
+
+def archive_year(year):
+    """Déplacer les pointages de `year` (année close) dans son fichier d'archive.
+
+    Les lignes sont d'abord copiées dans le fichier (validé seul), puis
+    l'enregistrement de la partition et la suppression des lignes copiées
+    sont validés ensemble dans la base principale. Une archive non
+    enregistrée n'est jamais lue : après une interruption, relancer suffit.
+    Les agrégats (employee_daily_total...) restent dans la base principale.
+    Retourne le nombre de pointages déplacés.
+    """
+    if year >= date.today().year:
+        raise ValueError(f'L\'année {year} n\'est pas close')
+
+    directory = archive_directory()
+    os.makedirs(directory, exist_ok=True)
+    filename = archive_filename(year)
+    path = os.path.join(directory, filename)
+    table = archive_table(year)
+    hot = TimeEntry.__table__
+    in_year = and_(hot.c.date >= date(year, 1, 1), hot.c.date <= date(year, 12, 31))
+
+    # 1. Copie : la version de la base principale remplace une copie antérieure
+    connection = db.session.connection()
+    _make_room(connection, {year})
+    _attach(connection, year, path)
+    table.metadata.create_all(connection)
+    columns = [column.name for column in hot.c]
+    db.session.execute(insert(table).prefix_with('OR REPLACE').from_select(columns, select(*hot.c).where(in_year)))
+    db.session.commit()
+
+    # 2. Enregistrement et suppression, dans une seule transaction de la base principale
+    connection = db.session.connection()
+    _make_room(connection, {year})
+    _attach(connection, year, path)
+    # Sans corrélation : les deux tables s'appellent time_entry
+    copied = tuple_(hot.c.employee_id, hot.c.date).in_(select(table.c.employee_id, table.c.date))
+    moved = db.session.execute(db.delete(hot).where(in_year, copied)).rowcount
+    total = db.session.execute(select(func.count()).select_from(table)).scalar()
+    db.session.merge(ArchivePartition(year=year, filename=filename, entries=total, archived_at=datetime.utcnow()))
+    db.session.commit()
+    return moved
@@ -1,8 +1,39 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import and_, case, cast, func, literal, literal_column, select
+from sqlalchemy.dialects.sqlite import insert
 
 db = SQLAlchemy()
 
+# Les 4 pointages de la journée, dans l'ordre
+PUNCH_TYPES = ['morning_in', 'lunch_out', 'lunch_in', 'evening_out']
+
+# Créneaux de travail : (pointage d'entrée, pointage de sortie, colonne d'heures)
+PERIODS = [
+    ('morning_in', 'lunch_out', 'morning_hours'),
+    ('lunch_in', 'evening_out', 'afternoon_hours')
+]
+
+# Pointage requis (non nul) avant chaque type de pointage
+PUNCH_PREREQUISITES = {
+    'lunch_out': 'morning_in',
+    'lunch_in': 'lunch_out',
+    'evening_out': 'lunch_in'
+}
+
+def _seconds_of_day(value):
+    """Secondes depuis minuit d'une heure stockée par SQLite ('HH:MM:SS.ffffff')"""
+    return (func.substr(value, 1, 2).cast(db.Integer) * 3600
+            + func.substr(value, 4, 2).cast(db.Integer) * 60
+            + func.substr(value, 7).cast(db.Float))
+
+def hours_between_sql(start, end):
+    """Équivalent SQL du calcul d'un créneau de calculate_hours (0 si incomplet)"""
+    return case(
+        (and_(start.is_not(None), end.is_not(None)), (_seconds_of_day(end) - _seconds_of_day(start)) / 3600.0),
+        else_=0.0
+    )
+
 class Employee(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     employee_number = db.Column(db.String(20), unique=True, nullable=False)
@@ -16,6 +47,11 @@ class Employee(db.Model):
     
     # Relation avec les pointages
     time_entries = db.relationship('TimeEntry', backref='employee', lazy=True, cascade='all, delete-orphan')
+    
+    # Listes et rapports triés par nom
+    __table_args__ = (
+        db.Index('idx_employee_name', 'last_name', 'first_name'),
+    )
 
     def __repr__(self):
         return f'<Employee {self.employee_number}: {self.first_name} {self.last_name}>'
@@ -56,9 +92,11 @@ class TimeEntry(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Index pour optimiser les requêtes
+    # Index pour optimiser les requêtes (un seul pointage par employé et par jour ;
+    # par date puis employé pour les listes et exports triés par date)
     __table_args__ = (
-        db.Index('idx_employee_date', 'employee_id', 'date'),
+        db.Index('idx_employee_date', 'employee_id', 'date', unique=True),
+        db.Index('idx_date_employee', 'date', 'employee_id'),
     )
 
     def __repr__(self):
@@ -85,6 +123,130 @@ class TimeEntry(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+    @classmethod
+    def projection_query(cls, source=None):
+        """Requête des seules colonnes utilisées par row_to_dict (pointage + employé).
+
+        `source` remplace la table des pointages (voir archive.entries_source).
+        """
+        source = source or cls
+        return db.session.query(
+            source.id,
+            source.employee_id,
+            source.date,
+            source.morning_in,
+            source.lunch_out,
+            source.lunch_in,
+            source.evening_out,
+            source.morning_hours,
+            source.afternoon_hours,
+            source.total_hours,
+            source.created_at,
+            source.updated_at,
+            Employee.first_name,
+            Employee.last_name,
+            Employee.employee_number
+        ).select_from(source).join(Employee, source.employee_id == Employee.id)
+
+    @staticmethod
+    def row_to_dict(row):
+        """Équivalent de to_dict pour une ligne de projection_query, sans objet ORM"""
+        return {
+            'id': row.id,
+            'employee_id': row.employee_id,
+            'employee': {
+                'first_name': row.first_name,
+                'last_name': row.last_name,
+                'employee_number': row.employee_number
+            },
+            'date': row.date.isoformat() if row.date else None,
+            'morning_in': row.morning_in.strftime('%H:%M') if row.morning_in else None,
+            'lunch_out': row.lunch_out.strftime('%H:%M') if row.lunch_out else None,
+            'lunch_in': row.lunch_in.strftime('%H:%M') if row.lunch_in else None,
+            'evening_out': row.evening_out.strftime('%H:%M') if row.evening_out else None,
+            'morning_hours': row.morning_hours,
+            'afternoon_hours': row.afternoon_hours,
+            'total_hours': row.total_hours,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'updated_at': row.updated_at.isoformat() if row.updated_at else None
+        }
+
+    @classmethod
+    def punch_insert_statement(cls, employee_id, day, punch_time, now):
+        """Arrivée du matin sur un jour sans pointage : INSERT ... ON CONFLICT DO NOTHING.
+
+        Renvoie la ligne créée (colonnes de projection_query), aucune si le
+        jour existe déjà : punch_statement() le complète alors.
+        """
+        statement = insert(cls.__table__).values(
+            employee_id=employee_id,
+            date=day,
+            morning_in=punch_time,
+            morning_hours=0.0,
+            afternoon_hours=0.0,
+            total_hours=0.0,
+            created_at=now,
+            updated_at=now
+        ).on_conflict_do_nothing(index_elements=['employee_id', 'date'])
+        return cls._punch_returning(statement)
+
+    @classmethod
+    def punch_statement(cls, employee_id, day, punch_type, punch_time, now):
+        """Instruction unique complétant le pointage existant du jour et recalculant les heures.
+
+        L'heure du pointage est liée une seule fois, dans une CTE relue par
+        ses expressions ; les conditions de garde reprennent l'ordre des pointages, si
+        bien qu'un pointage refusé ne renvoie aucune ligne. Les colonnes
+        renvoyées sont celles de projection_query.
+        """
+        table = cls.__table__
+        punch = select(literal(punch_time, db.Time).label('punch_time')).cte('punch')
+        new_value = select(punch.c.punch_time).scalar_subquery()
+        
+        values = {punch_type: new_value, 'updated_at': now}
+        for start, end, hours in PERIODS:
+            if punch_type in (start, end):
+                period_hours = hours_between_sql(
+                    new_value if punch_type == start else table.c[start],
+                    new_value if punch_type == end else table.c[end]
+                )
+                values[hours] = period_hours
+            else:
+                other_hours = func.coalesce(table.c[hours], 0.0)
+        values['total_hours'] = period_hours + other_hours
+        
+        guard = table.c[punch_type].is_(None)
+        if punch_type in PUNCH_PREREQUISITES:
+            guard = and_(guard, table.c[PUNCH_PREREQUISITES[punch_type]].is_not(None))
+        
+        statement = db.update(table).where(
+            table.c.employee_id == employee_id,
+            table.c.date == day,
+            guard
+        ).values(values).add_cte(punch)
+        return cls._punch_returning(statement)
+
+    @classmethod
+    def _punch_returning(cls, statement):
+        table = cls.__table__
+        
+        # RETURNING ne peut lire que time_entry : l'employé vient de sous-requêtes corrélées
+        def employee_column(column):
+            return select(column).where(Employee.id == literal_column('time_entry.employee_id'))\
+                                 .scalar_subquery().label(column.key)
+        
+        # SQLite renvoie les REAL entiers (0.0) comme des entiers : les reconvertir
+        def hours_column(name):
+            return cast(table.c[name], db.Float).label(name)
+        
+        columns = [hours_column(column.key) if column.key.endswith('_hours') else column for column in table.c]
+        return statement.returning(
+            *columns,
+            employee_column(Employee.first_name),
+            employee_column(Employee.last_name),
+            employee_column(Employee.employee_number)
+        )
+
     def calculate_hours(self):
         """Calcule les heures travaillées pour cette entrée"""
         self.morning_hours = 0.0
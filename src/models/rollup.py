@@ -0,0 +1,393 @@
+from datetime import timedelta
+from sqlalchemy import func, select, union_all, and_, or_
+from sqlalchemy.dialects.sqlite import insert
+from src.models.employee import db, TimeEntry
+from src.models.archive import ArchivePartition, entries_source
+
+class DailyTotal(db.Model):
+    """Agrégat par employé et par jour (jours pointés, total des heures)"""
+    __tablename__ = 'employee_daily_total'
+
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    days_worked = db.Column(db.Integer, default=0, nullable=False)
+    total_hours = db.Column(db.Float, default=0.0, nullable=False)
+
+    # Lecture d'une période pour tous les employés, sans accès à la table
+    __table_args__ = (
+        db.Index('idx_daily_total_date', 'date', 'employee_id', 'days_worked', 'total_hours'),
+    )
+
+    def __repr__(self):
+        return f'<DailyTotal {self.employee_id} - {self.date}>'
+
+
+class MonthlyTotal(db.Model):
+    """Agrégat par employé et par mois (month = premier jour du mois)"""
+    __tablename__ = 'employee_monthly_total'
+
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)
+    days_worked = db.Column(db.Integer, default=0, nullable=False)
+    total_hours = db.Column(db.Float, default=0.0, nullable=False)
+
+    # Rapport mensuel et mois complets des résumés, sans accès à la table
+    __table_args__ = (
+        db.Index('idx_monthly_total_month', 'month', 'employee_id', 'days_worked', 'total_hours'),
+    )
+
+    def __repr__(self):
+        return f'<MonthlyTotal {self.employee_id} - {self.month:%Y-%m}>'
+
+
+class WeeklyTotal(db.Model):
+    """Agrégat par employé et par semaine ISO (week = lundi de la semaine)"""
+    __tablename__ = 'employee_weekly_total'
+
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), primary_key=True)
+    week = db.Column(db.Date, primary_key=True)
+    days_worked = db.Column(db.Integer, default=0, nullable=False)
+    total_hours = db.Column(db.Float, default=0.0, nullable=False)
+
+    # Rapport des heures supplémentaires par semaine, sans accès à la table
+    __table_args__ = (
+        db.Index('idx_weekly_total_week', 'week', 'employee_id', 'days_worked', 'total_hours'),
+    )
+
+    def __repr__(self):
+        return f'<WeeklyTotal {self.employee_id} - {self.week}>'
+
+
+class LifetimeTotal(db.Model):
+    """Totaux de toute la carrière d'un employé (résumé sans période en O(1))"""
+    __tablename__ = 'employee_lifetime_total'
+
+    employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), primary_key=True)
+    days_worked = db.Column(db.Integer, default=0, nullable=False)
+    total_hours = db.Column(db.Float, default=0.0, nullable=False)
+
+    def __repr__(self):
+        return f'<LifetimeTotal {self.employee_id}>'
+
+
+def month_start(day):
+    """Premier jour du mois contenant `day`"""
+    return day.replace(day=1)
+
+def next_month_start(day):
+    """Premier jour du mois suivant celui contenant `day`"""
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+def week_start(day):
+    """Lundi de la semaine ISO contenant `day`"""
+    return day - timedelta(days=day.weekday())
+
+def _week_of(column):
+    # Lundi de la semaine ISO en SQL : dimanche suivant (ou même jour) moins 6 jours
+    return func.date(column, 'weekday 0', '-6 days')
+
+def _upsert_total(model, key, days_delta, hours_delta):
+    statement = insert(model).values(days_worked=days_delta, total_hours=hours_delta, **key)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(key),
+        set_={
+            'days_worked': model.days_worked + statement.excluded.days_worked,
+            'total_hours': model.total_hours + statement.excluded.total_hours
+        }
+    )
+    db.session.execute(statement)
+
+def record_entry_change(employee_id, entry_date, hours_delta, days_delta=0):
+    """Répercuter la modification d'un pointage sur les agrégats.
+
+    À appeler avant le commit, dans la même transaction que l'écriture du
+    pointage : `hours_delta` est la variation de total_hours, `days_delta`
+    vaut 1 lorsqu'un nouveau pointage (jour) est créé.
+    """
+    if not hours_delta and not days_delta:
+        return
+
+    _upsert_total(DailyTotal, {'employee_id': employee_id, 'date': entry_date}, days_delta, hours_delta)
+    _upsert_total(MonthlyTotal, {'employee_id': employee_id, 'month': month_start(entry_date)}, days_delta, hours_delta)
+    _upsert_total(WeeklyTotal, {'employee_id': employee_id, 'week': week_start(entry_date)}, days_delta, hours_delta)
+    _upsert_total(LifetimeTotal, {'employee_id': employee_id}, days_delta, hours_delta)
+
+def totals_subquery(start_date=None, end_date=None, employee_id=None):
+    """Lignes (employee_id, days_worked, total_hours) couvrant la période.
+
+    Les mois entièrement inclus dans la période sont lus dans MonthlyTotal,
+    les mois partiels aux bornes dans DailyTotal ; `employee_id` restreint
+    chaque partie à un employé.
+    """
+    full_from = None
+    if start_date:
+        full_from = start_date if start_date.day == 1 else next_month_start(start_date)
+    full_to = None
+    if end_date:
+        full_to = month_start(end_date + timedelta(days=1))
+
+    monthly = select(MonthlyTotal.employee_id, MonthlyTotal.days_worked, MonthlyTotal.total_hours)
+    if full_from:
+        monthly = monthly.where(MonthlyTotal.month >= full_from)
+    if full_to:
+        monthly = monthly.where(MonthlyTotal.month < full_to)
+    if employee_id:
+        monthly = monthly.where(MonthlyTotal.employee_id == employee_id)
+    employee_filter = [DailyTotal.employee_id == employee_id] if employee_id else []
+
+    if full_from and full_to and full_from >= full_to:
+        # Aucun mois complet : toute la période est lue au jour le jour
+        daily_filter = and_(DailyTotal.date >= start_date, DailyTotal.date <= end_date, *employee_filter)
+        return select(DailyTotal.employee_id, DailyTotal.days_worked, DailyTotal.total_hours)\
+            .where(daily_filter).subquery()
+
+    edges = []
+    if start_date and start_date < full_from:
+        edges.append(and_(DailyTotal.date >= start_date, DailyTotal.date < full_from))
+    if end_date and end_date >= full_to:
+        edges.append(and_(DailyTotal.date >= full_to, DailyTotal.date <= end_date))
+
+    if not edges:
+        return monthly.subquery()
+
+    daily = select(DailyTotal.employee_id, DailyTotal.days_worked, DailyTotal.total_hours)\
+        .where(or_(*edges), *employee_filter)
+    return union_all(monthly, daily).subquery()
+
+def totals_complete():
+    """Vrai si les agrégats mensuels comptent un jour par pointage (base principale et archives).
+
+    Faux sur une base mise à niveau dont l'historique n'a pas encore été agrégé.
+    """
+    entries = db.session.query(func.count(TimeEntry.id)).scalar()
+    archived = db.session.query(func.coalesce(func.sum(ArchivePartition.entries), 0)).scalar()
+    days = db.session.query(func.coalesce(func.sum(MonthlyTotal.days_worked), 0)).scalar()
+    return entries + archived == days
+
+def rebuild_totals(start_date=None, end_date=None, employee_id=None):
+    """Recalculer les agrégats depuis time_entry (reprise ou correction).
+
+    La période est étendue aux mois complets pour garder MonthlyTotal exact.
+    Ne commit pas : l'appelant valide la transaction.
+    """
+    if start_date:
+        start_date = month_start(start_date)
+    if end_date:
+        end_date = next_month_start(end_date) - timedelta(days=1)
+
+    for model, date_column in ((DailyTotal, DailyTotal.date), (MonthlyTotal, MonthlyTotal.month)):
+        delete = db.delete(model)
+        if start_date:
+            delete = delete.where(date_column >= start_date)
+        if end_date:
+            delete = delete.where(date_column <= end_date)
+        if employee_id:
+            delete = delete.where(model.employee_id == employee_id)
+        db.session.execute(delete)
+
+    # Pointages de la base principale et des archives de la période
+    entries = entries_source(start_date, end_date, employee_id)
+    source = select(entries.employee_id, entries.date, entries.total_hours)
+    if start_date:
+        source = source.where(entries.date >= start_date)
+    if end_date:
+        source = source.where(entries.date <= end_date)
+    if employee_id:
+        source = source.where(entries.employee_id == employee_id)
+    source = source.subquery()
+
+    db.session.execute(insert(DailyTotal).from_select(
+        ['employee_id', 'date', 'days_worked', 'total_hours'],
+        select(
+            source.c.employee_id,
+            source.c.date,
+            func.count(),
+            func.coalesce(func.sum(source.c.total_hours), 0.0)
+        ).group_by(source.c.employee_id, source.c.date)
+    ))
+
+    # Les lignes journalières viennent d'être écrites : le mensuel s'en déduit
+    daily = select(DailyTotal.employee_id, DailyTotal.date, DailyTotal.days_worked, DailyTotal.total_hours)
+    if start_date:
+        daily = daily.where(DailyTotal.date >= start_date)
+    if end_date:
+        daily = daily.where(DailyTotal.date <= end_date)
+    if employee_id:
+        daily = daily.where(DailyTotal.employee_id == employee_id)
+    daily = daily.subquery()
+    month = func.date(daily.c.date, 'start of month')
+
+    db.session.execute(insert(MonthlyTotal).from_select(
+        ['employee_id', 'month', 'days_worked', 'total_hours'],
+        select(
+            daily.c.employee_id,
+            month,
+            func.sum(daily.c.days_worked),
+            func.sum(daily.c.total_hours)
+        ).group_by(daily.c.employee_id, month)
+    ))
+
+    rebuild_weekly_totals(start_date, end_date, employee_id)
+    rebuild_lifetime_totals(employee_id)
+
+def rebuild_weekly_totals(start_date=None, end_date=None, employee_id=None):
+    """Recalculer les agrégats hebdomadaires depuis DailyTotal. Ne commit pas.
+
+    La période est étendue aux semaines complètes : une semaine à cheval
+    sur deux mois est relue entièrement.
+    """
+    if start_date:
+        start_date = week_start(start_date)
+    if end_date:
+        end_date = week_start(end_date) + timedelta(days=6)
+
+    delete = db.delete(WeeklyTotal)
+    daily = select(DailyTotal.employee_id, DailyTotal.date, DailyTotal.days_worked, DailyTotal.total_hours)
+    if start_date:
+        delete = delete.where(WeeklyTotal.week >= start_date)
+        daily = daily.where(DailyTotal.date >= start_date)
+    if end_date:
+        delete = delete.where(WeeklyTotal.week <= end_date)
+        daily = daily.where(DailyTotal.date <= end_date)
+    if employee_id:
+        delete = delete.where(WeeklyTotal.employee_id == employee_id)
+        daily = daily.where(DailyTotal.employee_id == employee_id)
+    db.session.execute(delete)
+
+    daily = daily.subquery()
+    week = _week_of(daily.c.date)
+    db.session.execute(insert(WeeklyTotal).from_select(
+        ['employee_id', 'week', 'days_worked', 'total_hours'],
+        select(
+            daily.c.employee_id,
+            week,
+            func.sum(daily.c.days_worked),
+            func.sum(daily.c.total_hours)
+        ).group_by(daily.c.employee_id, week)
+    ))
+
+def rebuild_lifetime_totals(employee_id=None):
+    """Recalculer les totaux de carrière depuis MonthlyTotal (toutes périodes). Ne commit pas."""
+    delete = db.delete(LifetimeTotal)
+    monthly = select(
+        MonthlyTotal.employee_id,
+        func.sum(MonthlyTotal.days_worked),
+        func.sum(MonthlyTotal.total_hours)
+    )
+    if employee_id:
+        delete = delete.where(LifetimeTotal.employee_id == employee_id)
+        monthly = monthly.where(MonthlyTotal.employee_id == employee_id)
+    db.session.execute(delete)
+    db.session.execute(insert(LifetimeTotal).from_select(
+        ['employee_id', 'days_worked', 'total_hours'],
+        monthly.group_by(MonthlyTotal.employee_id)
+    ))
+
+def check_totals(start_date=None, end_date=None, employee_id=None, tolerance=1e-6):
+    """Comparer les agrégats mensuels avec time_entry (et les archives).
+
+    Retourne la liste des écarts (employee_id, mois, attendu, stocké).
+    """
+    entries = entries_source(start_date and month_start(start_date), end_date, employee_id)
+    month = func.date(entries.date, 'start of month')
+    expected = select(
+        entries.employee_id,
+        month.label('month'),
+        func.count().label('days_worked'),
+        func.coalesce(func.sum(entries.total_hours), 0.0).label('total_hours')
+    )
+    stored = select(MonthlyTotal.employee_id, MonthlyTotal.month, MonthlyTotal.days_worked, MonthlyTotal.total_hours)
+    if start_date:
+        expected = expected.where(entries.date >= month_start(start_date))
+        stored = stored.where(MonthlyTotal.month >= month_start(start_date))
+    if end_date:
+        expected = expected.where(entries.date < next_month_start(end_date))
+        stored = stored.where(MonthlyTotal.month <= end_date)
+    if employee_id:
+        expected = expected.where(entries.employee_id == employee_id)
+        stored = stored.where(MonthlyTotal.employee_id == employee_id)
+    expected = expected.group_by(entries.employee_id, month)
+
+    expected_rows = {
+        (row.employee_id, row.month): (row.days_worked, row.total_hours)
+        for row in db.session.execute(expected)
+    }
+    stored_rows = {
+        (row.employee_id, row.month.isoformat()): (row.days_worked, row.total_hours)
+        for row in db.session.execute(stored)
+    }
+
+    mismatches = []
+    for key in sorted(set(expected_rows) | set(stored_rows)):
+        wanted = expected_rows.get(key, (0, 0.0))
+        actual = stored_rows.get(key, (0, 0.0))
+        if wanted[0] != actual[0] or abs(wanted[1] - actual[1]) > tolerance:
+            mismatches.append((key[0], key[1], wanted, actual))
+    return mismatches
+
+def check_lifetime_totals(employee_id=None, tolerance=1e-6):
+    """Comparer les totaux de carrière avec la somme des agrégats mensuels.
+
+    Retourne la liste des écarts (employee_id, attendu, stocké).
+    """
+    expected = select(
+        MonthlyTotal.employee_id,
+        func.sum(MonthlyTotal.days_worked).label('days_worked'),
+        func.sum(MonthlyTotal.total_hours).label('total_hours')
+    ).group_by(MonthlyTotal.employee_id)
+    stored = select(LifetimeTotal.employee_id, LifetimeTotal.days_worked, LifetimeTotal.total_hours)
+    if employee_id:
+        expected = expected.where(MonthlyTotal.employee_id == employee_id)
+        stored = stored.where(LifetimeTotal.employee_id == employee_id)
+
+    expected_rows = {row.employee_id: (row.days_worked, row.total_hours) for row in db.session.execute(expected)}
+    stored_rows = {row.employee_id: (row.days_worked, row.total_hours) for row in db.session.execute(stored)}
+
+    mismatches = []
+    for key in sorted(set(expected_rows) | set(stored_rows)):
+        wanted = expected_rows.get(key, (0, 0.0))
+        actual = stored_rows.get(key, (0, 0.0))
+        if wanted[0] != actual[0] or abs(wanted[1] - actual[1]) > tolerance:
+            mismatches.append((key, wanted, actual))
+    return mismatches
+
+def check_weekly_totals(start_date=None, end_date=None, employee_id=None, tolerance=1e-6):
+    """Comparer les agrégats hebdomadaires avec la somme des agrégats journaliers.
+
+    Retourne la liste des écarts (employee_id, semaine, attendu, stocké).
+    """
+    week = _week_of(DailyTotal.date)
+    expected = select(
+        DailyTotal.employee_id,
+        week.label('week'),
+        func.sum(DailyTotal.days_worked).label('days_worked'),
+        func.sum(DailyTotal.total_hours).label('total_hours')
+    )
+    stored = select(WeeklyTotal.employee_id, WeeklyTotal.week, WeeklyTotal.days_worked, WeeklyTotal.total_hours)
+    if start_date:
+        expected = expected.where(DailyTotal.date >= week_start(start_date))
+        stored = stored.where(WeeklyTotal.week >= week_start(start_date))
+    if end_date:
+        expected = expected.where(DailyTotal.date < week_start(end_date) + timedelta(days=7))
+        stored = stored.where(WeeklyTotal.week <= end_date)
+    if employee_id:
+        expected = expected.where(DailyTotal.employee_id == employee_id)
+        stored = stored.where(WeeklyTotal.employee_id == employee_id)
+    expected = expected.group_by(DailyTotal.employee_id, week)
+
+    expected_rows = {
+        (row.employee_id, row.week): (row.days_worked, row.total_hours)
+        for row in db.session.execute(expected)
+    }
+    stored_rows = {
+        (row.employee_id, row.week.isoformat()): (row.days_worked, row.total_hours)
+        for row in db.session.execute(stored)
+    }
+
+    mismatches = []
+    for key in sorted(set(expected_rows) | set(stored_rows)):
+        wanted = expected_rows.get(key, (0, 0.0))
+        actual = stored_rows.get(key, (0, 0.0))
+        if wanted[0] != actual[0] or abs(wanted[1] - actual[1]) > tolerance:
+            mismatches.append((key[0], key[1], wanted, actual))
+    return mismatches
@@ -0,0 +1,105 @@
+import re
+from sqlalchemy import literal_column, select, text
+from sqlalchemy.exc import OperationalError
+from src.models.employee import db, Employee
+
+# Index plein texte des employés (table FTS5 à contenu externe sur `employee`)
+FTS_TABLE = 'employee_fts'
+
+# Poids bm25 des colonnes : prénom, nom, numéro, email
+FTS_RANK = 'bm25(10.0, 10.0, 5.0, 1.0)'
+
+FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        first_name, last_name, employee_number, email,
+        content='employee', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON employee BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, first_name, last_name, employee_number, email)
+        VALUES (new.id, new.first_name, new.last_name, new.employee_number, new.email);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON employee BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, first_name, last_name, employee_number, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.employee_number, old.email);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+        AFTER UPDATE OF first_name, last_name, employee_number, email ON employee BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, first_name, last_name, employee_number, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.employee_number, old.email);
+        INSERT INTO {FTS_TABLE}(rowid, first_name, last_name, employee_number, email)
+        VALUES (new.id, new.first_name, new.last_name, new.employee_number, new.email);
+    END"""
+]
+
+# Disponibilité de l'index par base (URL du moteur), vérifiée une fois par processus
+_fts_status = {}
+
+def setup_employee_search():
+    """Créer l'index plein texte et ses triggers s'ils n'existent pas.
+
+    L'index est rempli à sa création. Retourne False si SQLite n'a pas FTS5,
+    auquel cas la recherche reste en ILIKE.
+    """
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+    ).first()
+
+    try:
+        if not exists:
+            db.session.execute(text(FTS_SCHEMA[0]))
+            db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', :rank)"),
+                               {'rank': FTS_RANK})
+            db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        for statement in FTS_SCHEMA[1:]:
+            db.session.execute(text(statement))
+        db.session.commit()
+    except OperationalError:
+        # SQLite compilé sans FTS5
+        db.session.rollback()
+        _fts_status[str(db.engine.url)] = False
+        return False
+
+    _fts_status[str(db.engine.url)] = True
+    return True
+
+def fts_available():
+    """Vrai si l'index plein texte existe dans la base courante"""
+    key = str(db.engine.url)
+    if key not in _fts_status:
+        _fts_status[key] = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+        ).first() is not None
+    return _fts_status[key]
+
+def fts_match_expression(term):
+    """Expression MATCH : chaque mot du terme devient un préfixe ("dup"* "jea"*)"""
+    words = re.findall(r'\w+', term)
+    return ' '.join(f'"{word}"*' for word in words)
+
+def search_employees(query, term):
+    """Filtrer `query` (sur Employee) par `term`, triée par pertinence si FTS5 est disponible.
+
+    Sans FTS5 (ou sans mot exploitable dans le terme), reprend le filtre
+    ILIKE '%terme%' sur les quatre colonnes.
+    """
+    match = fts_match_expression(term)
+    if match and fts_available():
+        matches = select(
+            literal_column('rowid').label('employee_id'),
+            literal_column('rank').label('rank')
+        ).select_from(text(FTS_TABLE))\
+         .where(text(f'{FTS_TABLE} MATCH :match').bindparams(match=match)).subquery()
+
+        return query.join(matches, matches.c.employee_id == Employee.id)\
+                    .order_by(matches.c.rank, Employee.last_name, Employee.first_name)
+
+    search_filter = f'%{term}%'
+    return query.filter(
+        db.or_(
+            Employee.first_name.ilike(search_filter),
+            Employee.last_name.ilike(search_filter),
+            Employee.employee_number.ilike(search_filter),
+            Employee.email.ilike(search_filter)
+        )
+    ).order_by(Employee.last_name, Employee.first_name)
@@ -0,0 +1,38 @@
+"""Heures supplémentaires hebdomadaires calculées sur les agrégats par semaine ISO"""
+
+# Paliers par défaut : de 35 h à 43 h majorées de 25 %, au-delà de 50 %
+DEFAULT_OVERTIME_TIERS = '35:25,43:50'
+
+def parse_tiers(value):
+    """Paliers « seuil:majoration » séparés par des virgules → [(seuil en heures, majoration en %)].
+
+    Chaque palier s'applique des heures au-delà de son seuil jusqu'au seuil
+    suivant ; le premier seuil est la durée hebdomadaire normale (35 ou 39 h).
+    """
+    tiers = []
+    for item in (value or DEFAULT_OVERTIME_TIERS).split(','):
+        try:
+            threshold, rate = item.split(':')
+            tiers.append((float(threshold), float(rate)))
+        except ValueError:
+            raise ValueError(f'Palier d\'heures supplémentaires invalide : {item.strip()!r} (attendu seuil:majoration)')
+    thresholds = [threshold for threshold, _ in tiers]
+    if thresholds[0] <= 0 or thresholds != sorted(set(thresholds)):
+        raise ValueError('Les seuils d\'heures supplémentaires doivent être positifs et croissants')
+    return tiers
+
+def tier_label(tiers, index):
+    """Libellé d'un palier, par exemple « 25% (35-43h) »"""
+    threshold, rate = tiers[index]
+    upper = f'-{tiers[index + 1][0]:g}h' if index + 1 < len(tiers) else 'h+'
+    return f'{rate:g}% ({threshold:g}{upper})'
+
+def split_overtime(total_hours, tiers):
+    """Répartir les heures d'une semaine : (heures normales, [heures de chaque palier])"""
+    total_hours = total_hours or 0.0
+    regular = min(total_hours, tiers[0][0])
+    by_tier = []
+    for index, (threshold, _) in enumerate(tiers):
+        upper = tiers[index + 1][0] if index + 1 < len(tiers) else total_hours
+        by_tier.append(max(0.0, min(total_hours, upper) - threshold))
+    return regular, by_tier
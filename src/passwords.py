@@ -0,0 +1,142 @@
+import hashlib
+import hmac
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import bcrypt
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    bcrypt = None
+
+# Vérifications bcrypt simultanées et demandes en attente au-delà desquelles
+# une connexion est refusée (503) plutôt que mise en file
+PASSWORD_WORKERS = int(os.environ.get('PASSWORD_WORKERS', min(4, os.cpu_count() or 1)))
+PASSWORD_QUEUE_SIZE = int(os.environ.get('PASSWORD_QUEUE_SIZE', 32))
+
+# Coût bcrypt : fixé par BCRYPT_ROUNDS, sinon calibré pour ~BCRYPT_TARGET_MS par hachage
+BCRYPT_ROUNDS = int(os.environ['BCRYPT_ROUNDS']) if os.environ.get('BCRYPT_ROUNDS') else None
+BCRYPT_TARGET_MS = float(os.environ.get('BCRYPT_TARGET_MS', 250))
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 15
+
+def _sha256(password):
+    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+
+def is_bcrypt_hash(hashed):
+    return hashed.startswith(('$2a$', '$2b$', '$2y$'))
+
+def bcrypt_rounds(hashed):
+    """Coût d'un hachage bcrypt ('$2b$12$...' -> 12)"""
+    return int(hashed.split('$')[2])
+
+_calibration = {}
+_calibration_lock = threading.Lock()
+
+def calibrate_rounds(target_ms=BCRYPT_TARGET_MS):
+    """Coût bcrypt le plus élevé dont le hachage reste sous `target_ms` sur cette machine.
+
+    Mesuré une fois par processus au coût minimal, puis extrapolé (chaque
+    point de coût double la durée) et borné à [BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS].
+    """
+    if BCRYPT_ROUNDS:
+        return BCRYPT_ROUNDS
+    with _calibration_lock:
+        if target_ms not in _calibration:
+            started = time.perf_counter()
+            bcrypt.hashpw(b'calibration', bcrypt.gensalt(BCRYPT_MIN_ROUNDS))
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            rounds = BCRYPT_MIN_ROUNDS + int(math.floor(math.log2(max(target_ms / elapsed_ms, 1))))
+            _calibration[target_ms] = min(rounds, BCRYPT_MAX_ROUNDS)
+        return _calibration[target_ms]
+
+def hash_password(password):
+    """Hasher un mot de passe (bcrypt au coût calibré, SHA-256 si bcrypt n'est pas installé)"""
+    if bcrypt is None:
+        return _sha256(password)
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(calibrate_rounds())).decode('utf-8')
+
+def check_password(password, hashed):
+    """Vérifier un mot de passe contre un hachage bcrypt ou SHA-256 (ancien format)"""
+    if is_bcrypt_hash(hashed):
+        if bcrypt is None:
+            return False
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    return hmac.compare_digest(_sha256(password), hashed)
+
+def calibrated_rounds():
+    """Coût bcrypt déjà connu (fixé ou calibré dans ce processus), sinon None"""
+    return BCRYPT_ROUNDS or _calibration.get(BCRYPT_TARGET_MS)
+
+def needs_rehash(hashed):
+    """Vrai si le hachage est à refaire à la prochaine connexion (SHA-256 ou coût trop faible)"""
+    if bcrypt is None:
+        return False
+    return not is_bcrypt_hash(hashed) or bcrypt_rounds(hashed) < calibrate_rounds()
+
+
+class VerifierBusy(Exception):
+    """File d'attente des vérifications de mot de passe pleine"""
+
+
+class PasswordVerifier:
+    """Pool borné pour les opérations bcrypt (vérification et hachage).
+
+    Au plus `workers` hachages s'exécutent en même temps (bcrypt libère le
+    GIL), ce qui laisse du CPU aux autres requêtes lors d'un pic de
+    connexions ; au-delà de `workers + queue_size` demandes en cours,
+    VerifierBusy est levée immédiatement. Les anciens hachages SHA-256 sont
+    vérifiés directement, sans passer par le pool.
+    """
+
+    def __init__(self, workers=PASSWORD_WORKERS, queue_size=PASSWORD_QUEUE_SIZE):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _submit(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise VerifierBusy()
+        try:
+            if self._executor is None:
+                with self._lock:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                            thread_name_prefix='password')
+            future = self._executor.submit(function, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def check(self, password, hashed):
+        """check_password() dans le pool (lève VerifierBusy si saturé)"""
+        if not is_bcrypt_hash(hashed):
+            return check_password(password, hashed)
+        return self._submit(check_password, password, hashed)
+
+    def hash(self, password):
+        """hash_password() dans le pool (lève VerifierBusy si saturé)"""
+        if bcrypt is None:
+            return hash_password(password)
+        return self._submit(hash_password, password)
+
+    def needs_rehash(self, hashed):
+        """needs_rehash() ; le premier calibrage du coût bcrypt s'exécute dans le pool.
+
+        Sans cela, les connexions d'un processus qui démarre attendraient
+        toutes le verrou de calibrage sur leur propre fil de requête.
+        """
+        if bcrypt is None or not is_bcrypt_hash(hashed) or calibrated_rounds():
+            return needs_rehash(hashed)
+        return self._submit(needs_rehash, hashed)
+
+password_verifier = PasswordVerifier()
@@ -1,17 +1,71 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, current_app
 from functools import wraps
-import hashlib
+from collections import OrderedDict, namedtuple
+import hmac
+import threading
+import time
 from src.models.employee import db, Employee
+from src.passwords import hash_password, check_password, password_verifier, VerifierBusy
+from src.routes.conditional import employee_etag, is_not_modified, not_modified_response, with_etag
 
 auth_bp = Blueprint('auth', __name__)
 
-def hash_password(password):
-    """Hasher un mot de passe avec SHA-256"""
-    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+# Droits d'un employé tels que vus par admin_required
+Principal = namedtuple('Principal', ['id', 'is_admin', 'is_active', 'role_version'])
 
-def check_password(password, hashed):
-    """Vérifier un mot de passe"""
-    return hash_password(password) == hashed
+class PrincipalCache:
+    """Cache LRU à durée de vie limitée des droits des employés (par processus).
+
+    Chaque employé a une version de rôle incrémentée par invalidate() : un
+    chargement commencé avant une invalidation n'est pas mis en cache, ce qui
+    évite de réinsérer des droits révoqués. Les autres processus ne voient
+    la révocation qu'à l'expiration du TTL.
+    """
+
+    def __init__(self, ttl=30, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, employee_id):
+        """Droits de l'employé, depuis le cache ou la base (None si inconnu)"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(employee_id)
+            if cached and cached[0] > now:
+                self._entries.move_to_end(employee_id)
+                return cached[1]
+            version = self._versions.get(employee_id, 0)
+        
+        row = db.session.query(Employee.id, Employee.is_admin, Employee.is_active)\
+                        .filter(Employee.id == employee_id).first()
+        if not row:
+            return None
+        principal = Principal(row.id, row.is_admin, row.is_active, version)
+        
+        with self._lock:
+            if self._versions.get(employee_id, 0) == version:
+                self._entries[employee_id] = (now + self.ttl, principal)
+                self._entries.move_to_end(employee_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, employee_id):
+        """Oublier les droits d'un employé (à appeler après le commit)"""
+        with self._lock:
+            self._versions[employee_id] = self._versions.get(employee_id, 0) + 1
+            self._entries.pop(employee_id, None)
+
+    def clear(self):
+        with self._lock:
+            for employee_id in self._entries:
+                self._versions[employee_id] = self._versions.get(employee_id, 0) + 1
+            self._entries.clear()
+
+principal_cache = PrincipalCache()
 
 def login_required(f):
     """Décorateur pour vérifier l'authentification"""
@@ -29,12 +83,32 @@ def admin_required(f):
         if 'employee_id' not in session:
             return jsonify({'error': 'Authentification requise'}), 401
         
-        employee = Employee.query.get(session['employee_id'])
-        if not employee or not employee.is_admin:
+        principal = principal_cache.get(session['employee_id'])
+        if not principal or not principal.is_admin or not principal.is_active:
             return jsonify({'error': 'Droits administrateur requis'}), 403
         return f(*args, **kwargs)
     return decorated_function
 
+def token_or_admin_required(config_key, get_token):
+    """Décorateur : jeton égal à app.config[config_key] (lu par `get_token()`) ou administrateur"""
+    def decorator(f):
+        admin_view = admin_required(f)
+        
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            token = get_token()
+            expected = current_app.config.get(config_key)
+            if token and expected and hmac.compare_digest(token, expected):
+                return f(*args, **kwargs)
+            return admin_view(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+# Badgeuse authentifiée par jeton (X-Terminal-Token) ou administrateur
+terminal_or_admin_required = token_or_admin_required(
+    'TERMINAL_TOKEN', lambda: request.headers.get('X-Terminal-Token')
+)
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """Connexion d'un employé"""
@@ -55,9 +129,23 @@ def login():
         if not employee.is_active:
             return jsonify({'error': 'Compte désactivé'}), 401
         
-        # Vérifier le mot de passe
-        if not check_password(password, employee.password_hash):
-            return jsonify({'error': 'Mot de passe incorrect'}), 401
+        # Vérifier le mot de passe (bcrypt dans le pool borné, SHA-256 directement)
+        try:
+            if not password_verifier.check(password, employee.password_hash):
+                return jsonify({'error': 'Mot de passe incorrect'}), 401
+            
+            # Ancien hachage SHA-256 ou coût bcrypt dépassé : rehacher avec le mot de passe en clair
+            if password_verifier.needs_rehash(employee.password_hash):
+                employee.password_hash = password_verifier.hash(password)
+                try:
+                    db.session.commit()
+                except Exception:
+                    # Le rehachage sera retenté à la prochaine connexion
+                    db.session.rollback()
+        except VerifierBusy:
+            response = jsonify({'error': 'Trop de connexions simultanées, veuillez réessayer'})
+            response.headers['Retry-After'] = '1'
+            return response, 503
         
         # Créer la session
         session['employee_id'] = employee.id
@@ -82,12 +170,17 @@ def logout():
 def get_current_user():
     """Récupérer les informations de l'utilisateur connecté"""
     try:
+        # Profil inchangé depuis le dernier appel du client : 304 sans charger l'employé
+        etag = employee_etag(session['employee_id'])
+        if is_not_modified(etag):
+            return not_modified_response(etag)
+        
         employee = Employee.query.get(session['employee_id'])
         if not employee:
             session.clear()
             return jsonify({'error': 'Utilisateur non trouvé'}), 401
         
-        return jsonify({'employee': employee.to_dict()}), 200
+        return with_etag(jsonify({'employee': employee.to_dict()}), etag), 200
         
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la récupération du profil: {str(e)}'}), 500
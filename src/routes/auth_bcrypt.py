@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify, session
 from functools import wraps
-import bcrypt
 from src.models.employee import db, Employee
+from src.passwords import password_verifier, VerifierBusy
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -47,9 +47,21 @@ def login():
         if not employee.is_active:
             return jsonify({'error': 'Compte désactivé'}), 401
         
-        # Vérifier le mot de passe
-        if not bcrypt.checkpw(password.encode('utf-8'), employee.password_hash.encode('utf-8')):
-            return jsonify({'error': 'Mot de passe incorrect'}), 401
+        # Vérifier le mot de passe dans le pool borné (503 si saturé)
+        try:
+            if not password_verifier.check(password, employee.password_hash):
+                return jsonify({'error': 'Mot de passe incorrect'}), 401
+            
+            if password_verifier.needs_rehash(employee.password_hash):
+                employee.password_hash = password_verifier.hash(password)
+                try:
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+        except VerifierBusy:
+            response = jsonify({'error': 'Trop de connexions simultanées, veuillez réessayer'})
+            response.headers['Retry-After'] = '1'
+            return response, 503
         
         # Créer la session
         session['employee_id'] = employee.id
@@ -0,0 +1,105 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask import request, current_app
+from src.models.employee import db, Employee, TimeEntry
+
+class VersionCache:
+    """Cache LRU à durée de vie limitée des versions (ETag) des ressources, par processus.
+
+    Les routes d'écriture appellent invalidate() après le commit ; comme pour
+    PrincipalCache, un chargement commencé avant une invalidation n'est pas
+    mis en cache. Les autres processus ne voient le changement qu'à
+    l'expiration du TTL.
+    """
+
+    def __init__(self, ttl=10, max_size=4096):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """Version de `key`, depuis le cache ou `loader()` (None si la ressource n'existe pas)"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached[0] > now:
+                self._entries.move_to_end(key)
+                return cached[1]
+            generation = self._generations.get(key, 0)
+
+        version = loader()
+        if version is None:
+            return None
+
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._entries[key] = (now + self.ttl, version)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return version
+
+    def invalidate(self, *keys):
+        """Oublier les versions de `keys` (à appeler après le commit)"""
+        with self._lock:
+            for key in keys:
+                self._generations[key] = self._generations.get(key, 0) + 1
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            for key in self._entries:
+                self._generations[key] = self._generations.get(key, 0) + 1
+            self._entries.clear()
+
+resource_versions = VersionCache()
+
+def employee_key(employee_id):
+    return ('employee', employee_id)
+
+def today_key(employee_id, day):
+    return ('today', employee_id, day)
+
+def employee_etag(employee_id):
+    """Version du profil d'un employé : empreinte des colonnes de to_dict()"""
+    def load():
+        row = db.session.query(
+            Employee.employee_number, Employee.first_name, Employee.last_name, Employee.email,
+            Employee.is_admin, Employee.is_active, Employee.created_at
+        ).filter(Employee.id == employee_id).first()
+        if not row:
+            return None
+        return hashlib.sha1(repr(tuple(row)).encode('utf-8')).hexdigest()[:16]
+    return resource_versions.get(employee_key(employee_id), load)
+
+def today_etag(employee_id, day):
+    """Version du pointage du jour : updated_at de l'entrée et version de l'employé (nom inclus dans to_dict)"""
+    def load():
+        updated_at = db.session.query(TimeEntry.updated_at)\
+                               .filter(TimeEntry.employee_id == employee_id, TimeEntry.date == day).scalar()
+        return updated_at.isoformat() if updated_at else 'none'
+
+    employee_version = employee_etag(employee_id)
+    if employee_version is None:
+        return None
+    entry_version = resource_versions.get(today_key(employee_id, day), load)
+    return f'{day.isoformat()}.{entry_version}.{employee_version}'
+
+def is_not_modified(etag):
+    """Vrai si l'en-tête If-None-Match du client correspond à `etag` (comparaison faible)"""
+    return etag is not None and request.if_none_match.contains_weak(etag)
+
+def not_modified_response(etag):
+    """Réponse 304 sans corps pour `etag`"""
+    return with_etag(current_app.response_class(status=304), etag)
+
+def with_etag(response, etag):
+    """Ajouter un ETag faible ; le client doit revalider à chaque appel"""
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
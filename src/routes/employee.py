@@ -1,24 +1,34 @@
 from flask import Blueprint, request, jsonify, session
-import hashlib
-
-def hash_password(password):
-    """Hasher un mot de passe avec SHA-256"""
-    return hashlib.sha256(password.encode('utf-8')).hexdigest()
 from src.models.employee import db, Employee
-from src.routes.auth import login_required, admin_required
+from src.passwords import password_verifier, VerifierBusy
+from src.models.search import search_employees
+from src.routes.auth import login_required, admin_required, principal_cache
+from src.routes.report_cache import report_cache
+from src.routes.conditional import resource_versions, employee_key, employee_etag, is_not_modified, not_modified_response, with_etag
 
 employee_bp = Blueprint('employee', __name__)
 
+def password_busy_response():
+    """Réponse 503 lorsque le pool bcrypt est saturé (comme à la connexion)"""
+    db.session.rollback()
+    response = jsonify({'error': 'Trop de demandes simultanées, veuillez réessayer'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @employee_bp.route('/profile', methods=['GET'])
 @login_required
 def get_profile():
     """Récupérer le profil de l'employé connecté"""
     try:
+        etag = employee_etag(session['employee_id'])
+        if is_not_modified(etag):
+            return not_modified_response(etag)
+        
         employee = Employee.query.get(session['employee_id'])
         if not employee:
             return jsonify({'error': 'Employé non trouvé'}), 404
         
-        return jsonify({'employee': employee.to_dict()}), 200
+        return with_etag(jsonify({'employee': employee.to_dict()}), etag), 200
         
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la récupération du profil: {str(e)}'}), 500
@@ -51,21 +61,25 @@ def update_profile():
         
         # Changement de mot de passe
         if 'current_password' in data and 'new_password' in data:
-            if not hash_password(data["current_password"]) == employee.password_hash:
+            if not password_verifier.check(data['current_password'], employee.password_hash):
                 return jsonify({'error': 'Mot de passe actuel incorrect'}), 400
             
             if len(data['new_password']) < 6:
                 return jsonify({'error': 'Le nouveau mot de passe doit contenir au moins 6 caractères'}), 400
             
-            employee.password_hash = hash_password(data["password"])
+            employee.password_hash = password_verifier.hash(data['new_password'])
         
         db.session.commit()
+        resource_versions.invalidate(employee_key(employee.id))
+        report_cache.clear()
         
         return jsonify({
             'message': 'Profil mis à jour avec succès',
             'employee': employee.to_dict()
         }), 200
         
+    except VerifierBusy:
+        return password_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Erreur lors de la mise à jour: {str(e)}'}), 500
@@ -87,17 +101,10 @@ def get_employees():
         query = Employee.query
         
         if search:
-            search_filter = f'%{search}%'
-            query = query.filter(
-                db.or_(
-                    Employee.first_name.ilike(search_filter),
-                    Employee.last_name.ilike(search_filter),
-                    Employee.employee_number.ilike(search_filter),
-                    Employee.email.ilike(search_filter)
-                )
-            )
-        
-        query = query.order_by(Employee.last_name, Employee.first_name)
+            # Index plein texte (préfixes, pertinence) ou ILIKE si FTS5 indisponible
+            query = search_employees(query, search)
+        else:
+            query = query.order_by(Employee.last_name, Employee.first_name)
         employees = query.paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
@@ -141,7 +148,7 @@ def create_employee():
             first_name=data['first_name'],
             last_name=data['last_name'],
             email=data['email'],
-            password_hash=hash_password(data['password']),
+            password_hash=password_verifier.hash(data['password']),
             is_admin=data.get('is_admin', False),
             is_active=data.get('is_active', True)
         )
@@ -154,6 +161,8 @@ def create_employee():
             'employee': employee.to_dict()
         }), 201
         
+    except VerifierBusy:
+        return password_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Erreur lors de la création: {str(e)}'}), 500
@@ -206,7 +215,7 @@ def update_employee(employee_id):
         if 'password' in data and data['password']:
             if len(data['password']) < 6:
                 return jsonify({'error': 'Le mot de passe doit contenir au moins 6 caractères'}), 400
-            employee.password_hash = hash_password(data["password"])
+            employee.password_hash = password_verifier.hash(data["password"])
         
         if 'is_admin' in data:
             employee.is_admin = data['is_admin']
@@ -215,11 +224,18 @@ def update_employee(employee_id):
         
         db.session.commit()
         
+        # Les droits modifiés s'appliquent dès la requête suivante
+        principal_cache.invalidate(employee_id)
+        resource_versions.invalidate(employee_key(employee_id))
+        report_cache.clear()
+        
         return jsonify({
             'message': 'Employé mis à jour avec succès',
             'employee': employee.to_dict()
         }), 200
         
+    except VerifierBusy:
+        return password_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Erreur lors de la mise à jour: {str(e)}'}), 500
@@ -238,6 +254,9 @@ def delete_employee(employee_id):
         # Soft delete : désactiver plutôt que supprimer
         employee.is_active = False
         db.session.commit()
+        principal_cache.invalidate(employee_id)
+        resource_versions.invalidate(employee_key(employee_id))
+        report_cache.clear()
         
         return jsonify({'message': 'Employé désactivé avec succès'}), 200
         
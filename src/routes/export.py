@@ -1,7 +1,13 @@
-from flask import Blueprint, request, jsonify, make_response
+from flask import Blueprint, request, jsonify, make_response, send_file, Response, stream_with_context
 from datetime import datetime, date, timedelta
-from src.models.employee import db, Employee, TimeEntry
+from src.models.employee import db, Employee
+from src.models.rollup import MonthlyTotal, totals_subquery
+from src.models.archive import entries_source
 from src.routes.auth import admin_required
+from src.compression import compressed
+from src.columnar import COLUMNAR_FORMATS, columnar_available, iter_entries_columnar
+from src.routes.export_jobs import export_jobs, async_export
+from src.routes.report_cache import report_cache, cached_report, summary_months, monthly_months
 import csv
 import io
 import json
@@ -9,78 +15,157 @@ from sqlalchemy import func
 
 export_bp = Blueprint('export', __name__)
 
+# Nombre de lignes lues et rendues à la fois lors d'un export CSV
+CSV_CHUNK_SIZE = 1000
+
+CSV_HEADERS = [
+    'Date',
+    'Numéro Employé',
+    'Prénom',
+    'Nom',
+    'Entrée Matin',
+    'Sortie Midi',
+    'Entrée Après-midi',
+    'Sortie Soir',
+    'Heures Matin',
+    'Heures Après-midi',
+    'Total Heures'
+]
+
+def build_entries_query(start_date=None, end_date=None, employee_id=None):
+    """Construire la requête des pointages à exporter (colonnes uniquement, sans objets ORM)
+    
+    Les années archivées de la période sont lues dans leurs fichiers d'archive.
+    """
+    entries = entries_source(start_date, end_date, employee_id)
+    query = db.session.query(
+        entries.date,
+        Employee.employee_number,
+        Employee.first_name,
+        Employee.last_name,
+        entries.morning_in,
+        entries.lunch_out,
+        entries.lunch_in,
+        entries.evening_out,
+        entries.morning_hours,
+        entries.afternoon_hours,
+        entries.total_hours
+    ).select_from(entries).join(Employee, entries.employee_id == Employee.id)
+    
+    if start_date:
+        query = query.filter(entries.date >= start_date)
+    if end_date:
+        query = query.filter(entries.date <= end_date)
+    if employee_id:
+        query = query.filter(entries.employee_id == employee_id)
+    
+    return query.order_by(entries.date.desc(), Employee.last_name, Employee.first_name)
+
+def iter_entries_csv(query, chunk_size=CSV_CHUNK_SIZE):
+    """Générer le CSV des pointages par blocs de `chunk_size` lignes.
+    
+    Les lignes sont lues avec un curseur (yield_per) : la mémoire utilisée
+    reste constante quel que soit le nombre de pointages exportés.
+    """
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_HEADERS)
+    
+    pending = 0
+    for row in query.yield_per(chunk_size):
+        writer.writerow([
+            row.date.strftime('%Y-%m-%d') if row.date else '',
+            row.employee_number,
+            row.first_name,
+            row.last_name,
+            row.morning_in.strftime('%H:%M') if row.morning_in else '',
+            row.lunch_out.strftime('%H:%M') if row.lunch_out else '',
+            row.lunch_in.strftime('%H:%M') if row.lunch_in else '',
+            row.evening_out.strftime('%H:%M') if row.evening_out else '',
+            f'{row.morning_hours:.2f}' if row.morning_hours else '0.00',
+            f'{row.afternoon_hours:.2f}' if row.afternoon_hours else '0.00',
+            f'{row.total_hours:.2f}' if row.total_hours else '0.00'
+        ])
+        pending += 1
+        
+        if pending >= chunk_size:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+            pending = 0
+    
+    yield output.getvalue()
+
 @export_bp.route('/admin/export/csv', methods=['GET'])
 @admin_required
+@compressed
+@async_export
 def export_csv():
-    """Exporter les données de pointage en CSV (admin seulement)"""
+    """Exporter les données de pointage en CSV (admin seulement)
+    
+    La réponse est envoyée en flux (chunked) au fur et à mesure de la lecture
+    des pointages, sans construire le fichier complet en mémoire.
+    """
     try:
         # Paramètres de filtrage
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         employee_id = request.args.get('employee_id', type=int)
         
-        # Construction de la requête
-        query = db.session.query(TimeEntry, Employee).join(Employee)
+        # Les paramètres sont validés avant l'envoi du premier octet
+        query = build_entries_query(
+            start_date=datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None,
+            end_date=datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None,
+            employee_id=employee_id
+        )
         
-        if start_date:
-            query = query.filter(TimeEntry.date >= datetime.strptime(start_date, '%Y-%m-%d').date())
-        if end_date:
-            query = query.filter(TimeEntry.date <= datetime.strptime(end_date, '%Y-%m-%d').date())
-        if employee_id:
-            query = query.filter(TimeEntry.employee_id == employee_id)
-        
-        query = query.order_by(TimeEntry.date.desc(), Employee.last_name, Employee.first_name)
+        response = Response(stream_with_context(iter_entries_csv(query)), mimetype='text/csv')
+        response.headers['Content-Type'] = 'text/csv; charset=utf-8'
+        response.headers['Content-Disposition'] = f'attachment; filename=pointages_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
         
-        # Création du CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
+        return response
         
-        # En-têtes
-        headers = [
-            'Date',
-            'Numéro Employé',
-            'Prénom',
-            'Nom',
-            'Entrée Matin',
-            'Sortie Midi',
-            'Entrée Après-midi',
-            'Sortie Soir',
-            'Heures Matin',
-            'Heures Après-midi',
-            'Total Heures'
-        ]
-        writer.writerow(headers)
+    except Exception as e:
+        return jsonify({'error': f'Erreur lors de l\'export CSV: {str(e)}'}), 500
+
+@export_bp.route('/admin/export/columnar', methods=['GET'])
+@admin_required
+@async_export
+def export_columnar():
+    """Exporter les pointages en Parquet ou en flux Arrow IPC (admin seulement)
+    
+    Mêmes filtres et mêmes lignes que l'export CSV, avec des colonnes typées
+    (date, heure, durée en heures décimales) ; envoyé en flux par groupes de lignes.
+    """
+    try:
+        format_type = request.args.get('format', 'parquet')  # parquet ou arrow
+        if format_type not in COLUMNAR_FORMATS:
+            return jsonify({'error': 'Format invalide (parquet ou arrow)'}), 400
+        if not columnar_available():
+            return jsonify({'error': 'Export Parquet/Arrow indisponible : module pyarrow non installé'}), 501
         
-        # Données
-        for time_entry, employee in query.all():
-            row = [
-                time_entry.date.strftime('%Y-%m-%d') if time_entry.date else '',
-                employee.employee_number,
-                employee.first_name,
-                employee.last_name,
-                time_entry.morning_in.strftime('%H:%M') if time_entry.morning_in else '',
-                time_entry.lunch_out.strftime('%H:%M') if time_entry.lunch_out else '',
-                time_entry.lunch_in.strftime('%H:%M') if time_entry.lunch_in else '',
-                time_entry.evening_out.strftime('%H:%M') if time_entry.evening_out else '',
-                f'{time_entry.morning_hours:.2f}' if time_entry.morning_hours else '0.00',
-                f'{time_entry.afternoon_hours:.2f}' if time_entry.afternoon_hours else '0.00',
-                f'{time_entry.total_hours:.2f}' if time_entry.total_hours else '0.00'
-            ]
-            writer.writerow(row)
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        query = build_entries_query(
+            start_date=datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None,
+            end_date=datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None,
+            employee_id=request.args.get('employee_id', type=int)
+        )
         
-        # Préparer la réponse
-        output.seek(0)
-        response = make_response(output.getvalue())
-        response.headers['Content-Type'] = 'text/csv; charset=utf-8'
-        response.headers['Content-Disposition'] = f'attachment; filename=pointages_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+        mimetype, extension = COLUMNAR_FORMATS[format_type]
+        response = Response(stream_with_context(iter_entries_columnar(query, format_type)), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=pointages_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
         
         return response
         
     except Exception as e:
-        return jsonify({'error': f'Erreur lors de l\'export CSV: {str(e)}'}), 500
+        return jsonify({'error': f'Erreur lors de l\'export {request.args.get("format", "parquet")}: {str(e)}'}), 500
 
 @export_bp.route('/admin/export/summary', methods=['GET'])
 @admin_required
+@compressed
+@async_export
+@cached_report(summary_months)
 def export_summary():
     """Exporter un résumé des heures par employé"""
     try:
@@ -89,22 +174,25 @@ def export_summary():
         end_date = request.args.get('end_date')
         format_type = request.args.get('format', 'json')  # json ou csv
         
-        # Construction de la requête
+        # Les totaux sont lus dans les agrégats (mois complets + jours aux bornes)
+        totals = totals_subquery(
+            start_date=datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None,
+            end_date=datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        )
+        days_worked = func.sum(totals.c.days_worked)
+        total_hours = func.sum(totals.c.total_hours)
+        
         query = db.session.query(
             Employee.employee_number,
             Employee.first_name,
             Employee.last_name,
-            func.count(TimeEntry.id).label('days_worked'),
-            func.sum(TimeEntry.total_hours).label('total_hours'),
-            func.avg(TimeEntry.total_hours).label('average_hours')
-        ).join(TimeEntry).filter(Employee.is_active == True)
+            days_worked.label('days_worked'),
+            total_hours.label('total_hours'),
+            (total_hours / days_worked).label('average_hours')
+        ).join(totals, totals.c.employee_id == Employee.id).filter(Employee.is_active == True)
         
-        if start_date:
-            query = query.filter(TimeEntry.date >= datetime.strptime(start_date, '%Y-%m-%d').date())
-        if end_date:
-            query = query.filter(TimeEntry.date <= datetime.strptime(end_date, '%Y-%m-%d').date())
-        
-        query = query.group_by(Employee.id).order_by(Employee.last_name, Employee.first_name)
+        query = query.group_by(Employee.id).having(days_worked > 0)\
+                     .order_by(Employee.last_name, Employee.first_name)
         
         results = query.all()
         
@@ -171,6 +259,9 @@ def export_summary():
 
 @export_bp.route('/admin/export/monthly', methods=['GET'])
 @admin_required
+@compressed
+@async_export
+@cached_report(monthly_months)
 def export_monthly():
     """Exporter un rapport mensuel"""
     try:
@@ -185,18 +276,18 @@ def export_monthly():
         else:
             end_date = date(year, month + 1, 1) - timedelta(days=1)
         
-        # Requête pour les données du mois
+        # Requête sur l'agrégat mensuel (une ligne par employé)
         query = db.session.query(
             Employee.employee_number,
             Employee.first_name,
             Employee.last_name,
-            func.count(TimeEntry.id).label('days_worked'),
-            func.sum(TimeEntry.total_hours).label('total_hours')
-        ).join(TimeEntry).filter(
+            MonthlyTotal.days_worked,
+            MonthlyTotal.total_hours
+        ).join(MonthlyTotal, MonthlyTotal.employee_id == Employee.id).filter(
             Employee.is_active == True,
-            TimeEntry.date >= start_date,
-            TimeEntry.date <= end_date
-        ).group_by(Employee.id).order_by(Employee.last_name, Employee.first_name)
+            MonthlyTotal.month == start_date,
+            MonthlyTotal.days_worked > 0
+        ).order_by(Employee.last_name, Employee.first_name)
         
         results = query.all()
         
@@ -284,3 +375,38 @@ def export_monthly():
         
     except Exception as e:
         return jsonify({'error': f'Erreur lors de l\'export mensuel: {str(e)}'}), 500
+
+@export_bp.route('/admin/export/jobs/<job_id>', methods=['GET'])
+@admin_required
+def get_export_job(job_id):
+    """État d'un export en tâche de fond (admin seulement)"""
+    job = export_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Export non trouvé ou expiré'}), 404
+    return jsonify({'job': export_jobs.describe(job)}), 200
+
+@export_bp.route('/admin/export/jobs/<job_id>/download', methods=['GET'])
+@admin_required
+def download_export_job(job_id):
+    """Télécharger le fichier d'un export terminé (admin seulement)"""
+    job = export_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Export non trouvé ou expiré'}), 404
+    if job['status'] != 'done':
+        return jsonify({'error': 'Export non terminé', 'job': export_jobs.describe(job)}), 409
+    
+    return send_file(job['file'], mimetype=job['mimetype'], as_attachment=True,
+                     download_name=job['filename'] or job['id'], conditional=True)
+
+@export_bp.route('/admin/export/cache', methods=['GET'])
+@admin_required
+def get_report_cache_stats():
+    """Compteurs du cache des rapports (admin seulement)"""
+    return jsonify({'report_cache': report_cache.stats()}), 200
+
+@export_bp.route('/admin/export/cache', methods=['DELETE'])
+@admin_required
+def clear_report_cache():
+    """Vider le cache des rapports de ce processus (ex. après rebuild_rollups.py)"""
+    report_cache.clear()
+    return jsonify({'message': 'Cache des rapports vidé'}), 200
@@ -0,0 +1,198 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import wraps
+from flask import request, jsonify, current_app, make_response, url_for
+
+# Paramètre de requête qui bascule un export en tâche de fond
+ASYNC_PARAM = 'async'
+
+
+class ExportQueueFull(Exception):
+    """Trop d'exports en attente ou en cours"""
+
+
+class ExportJobManager:
+    """Exports en tâche de fond (par processus) : file bornée, fichiers sur disque, expiration.
+
+    Une tâche identique (même route, mêmes paramètres) en attente ou en
+    cours est réutilisée au lieu d'être relancée ; une tâche terminée ne
+    l'est pas, ses données pouvant avoir changé depuis. Au-delà de
+    `max_pending` tâches en attente ou en cours, ExportQueueFull est levée.
+    Les fichiers des tâches expirées sont supprimés à l'appel suivant.
+    """
+
+    def __init__(self, workers=2, ttl=3600, directory=None, max_pending=10):
+        self.workers = workers
+        self.ttl = ttl
+        self.max_pending = max_pending
+        # None : dossier privé créé au premier export (tempfile.mkdtemp)
+        self.directory = directory
+        self._executor = None
+        self._jobs = {}
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def configure(self, config):
+        self.workers = config.get('EXPORT_JOB_WORKERS', self.workers)
+        self.ttl = config.get('EXPORT_JOB_TTL', self.ttl)
+        self.directory = config.get('EXPORT_JOB_DIR') or self.directory
+        self.max_pending = config.get('EXPORT_JOB_MAX_PENDING', self.max_pending)
+
+    def submit(self, app, view, path, params):
+        """Tâche exécutant `view` pour `path`?`params`, existante si identique et non terminée"""
+        key = (path, tuple(sorted(params)))
+        with self._lock:
+            self._purge_expired()
+            job = self._jobs.get(self._by_key.get(key))
+            if job and job['status'] in ('queued', 'running'):
+                return job, False
+
+            pending = sum(1 for job in self._jobs.values() if job['status'] in ('queued', 'running'))
+            if pending >= self.max_pending:
+                raise ExportQueueFull()
+
+            if self._executor is None:
+                self.directory = _private_directory(self.directory)
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='export')
+            job = {
+                'id': uuid.uuid4().hex,
+                'key': key,
+                'path': path,
+                'params': dict(params),
+                'status': 'queued',
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'file': None,
+                'filename': None,
+                'mimetype': None,
+                'size': None,
+                'error': None
+            }
+            self._jobs[job['id']] = job
+            self._by_key[key] = job['id']
+
+        self._executor.submit(self._run, app, view, job)
+        return job, True
+
+    def _run(self, app, view, job):
+        job['status'] = 'running'
+        job['started_at'] = time.time()
+        file_path = os.path.join(self.directory, job['id'])
+        try:
+            # La vue s'exécute comme pour une requête synchrone (sans le contrôle admin déjà fait)
+            with app.test_request_context(job['path'], query_string=job['params']):
+                response = make_response(view())
+                if response.status_code != 200:
+                    raise RuntimeError(_error_message(response))
+                # Lisible du seul compte du serveur (données de paie)
+                with os.fdopen(os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'wb') as output:
+                    for chunk in response.iter_encoded():
+                        output.write(chunk)
+                response.close()
+
+            disposition = response.headers.get('Content-Disposition', '')
+            job['filename'] = disposition.split('filename=', 1)[1] if 'filename=' in disposition else None
+            job['mimetype'] = response.mimetype
+            job['file'] = file_path
+            job['size'] = os.path.getsize(file_path)
+            job['status'] = 'done'
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        finally:
+            job['finished_at'] = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def _purge_expired(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job['finished_at'] and job['finished_at'] + self.ttl < now:
+                if job['file'] and os.path.exists(job['file']):
+                    os.remove(job['file'])
+                del self._jobs[job_id]
+                if self._by_key.get(job['key']) == job_id:
+                    del self._by_key[job['key']]
+
+    def describe(self, job):
+        """Représentation JSON d'une tâche"""
+        def isoformat(timestamp):
+            return datetime.fromtimestamp(timestamp).isoformat(timespec='seconds') if timestamp else None
+
+        return {
+            'id': job['id'],
+            'status': job['status'],
+            'path': job['path'],
+            'params': job['params'],
+            'created_at': isoformat(job['created_at']),
+            'started_at': isoformat(job['started_at']),
+            'finished_at': isoformat(job['finished_at']),
+            'expires_at': isoformat(job['finished_at'] + self.ttl if job['finished_at'] else None),
+            'filename': job['filename'],
+            'size': job['size'],
+            'error': job['error'],
+            'status_url': url_for('export.get_export_job', job_id=job['id']),
+            'download_url': url_for('export.download_export_job', job_id=job['id']) if job['status'] == 'done' else None
+        }
+
+def _private_directory(directory):
+    """Dossier des fichiers d'export, réservé au compte du serveur.
+
+    Sans dossier configuré, un dossier temporaire au nom imprévisible est
+    créé (mode 0700). Un dossier configuré est créé en 0700 s'il manque ;
+    existant, il doit appartenir au compte du serveur et n'être accessible
+    qu'à lui.
+    """
+    if not directory:
+        return tempfile.mkdtemp(prefix='pointeuse_exports_')
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    status = os.stat(directory)
+    if status.st_uid != os.getuid() or status.st_mode & 0o077:
+        raise PermissionError(f'Dossier d\'export non privé : {directory} '
+                              f'(propriétaire du serveur et mode 0700 requis)')
+    return directory
+
+def _error_message(response):
+    try:
+        return json.loads(response.get_data()).get('error', f'Statut {response.status_code}')
+    except (ValueError, AttributeError):
+        return f'Statut {response.status_code}'
+
+export_jobs = ExportJobManager()
+
+def async_export(f):
+    """Décorateur : avec ?async=1, mettre l'export en file et répondre 202 avec la tâche.
+
+    Le client suit la tâche via son status_url puis télécharge le fichier
+    (download_url). À placer sous admin_required.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if request.args.get(ASYNC_PARAM) not in ('1', 'true'):
+            return f(*args, **kwargs)
+
+        export_jobs.configure(current_app.config)
+        params = [(name, value) for name, value in request.args.items(multi=True) if name != ASYNC_PARAM]
+        try:
+            job, _ = export_jobs.submit(current_app._get_current_object(), lambda: f(*args, **kwargs),
+                                        request.path, params)
+        except ExportQueueFull:
+            response = jsonify({'error': 'Trop d\'exports en cours, veuillez réessayer'})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        response = jsonify({'job': export_jobs.describe(job)})
+        response.headers['Location'] = url_for('export.get_export_job', job_id=job['id'])
+        return response, 202
+    return decorated_function
@@ -0,0 +1,33 @@
+from flask import Blueprint, request, jsonify, current_app
+from src.metrics import request_metrics
+from src.slow_queries import slow_query_log
+from src.routes.auth import admin_required, token_or_admin_required
+
+metrics_bp = Blueprint('metrics', __name__)
+
+def _bearer_token():
+    authorization = request.headers.get('Authorization', '')
+    return authorization[len('Bearer '):] if authorization.startswith('Bearer ') else None
+
+@metrics_bp.route('/metrics', methods=['GET'])
+@token_or_admin_required('METRICS_TOKEN', _bearer_token)
+def get_metrics():
+    """Métriques Prometheus de ce processus (admin, ou en-tête Authorization: Bearer METRICS_TOKEN)"""
+    return current_app.response_class(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@metrics_bp.route('/api/admin/slow-queries', methods=['GET'])
+@admin_required
+def get_slow_queries():
+    """Dernières requêtes SQL lentes de ce processus, avec leur plan (admin seulement)"""
+    return jsonify({
+        'threshold_ms': slow_query_log.threshold_ms,
+        'capacity': slow_query_log.capacity,
+        'queries': slow_query_log.entries()
+    }), 200
+
+@metrics_bp.route('/api/admin/slow-queries', methods=['DELETE'])
+@admin_required
+def clear_slow_queries():
+    """Vider le journal des requêtes lentes de ce processus (admin seulement)"""
+    slow_query_log.clear()
+    return jsonify({'message': 'Journal des requêtes lentes vidé'}), 200
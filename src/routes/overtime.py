@@ -0,0 +1,154 @@
+from flask import Blueprint, request, jsonify, make_response, current_app
+from datetime import datetime, date, timedelta
+from src.models.employee import db, Employee
+from src.models.rollup import WeeklyTotal, week_start
+from src.overtime import parse_tiers, tier_label, split_overtime
+from src.routes.auth import admin_required
+from src.compression import compressed
+from src.routes.report_cache import cached_report, parse_date_arg
+import csv
+import io
+
+overtime_bp = Blueprint('overtime', __name__)
+
+# Période par défaut : les 4 dernières semaines, semaine en cours comprise
+DEFAULT_WEEKS = 4
+
+def overtime_period():
+    """(lundi de la première semaine, dimanche de la dernière) de la période demandée"""
+    end_date = parse_date_arg('end_date') or date.today()
+    start_date = parse_date_arg('start_date') or week_start(end_date) - timedelta(weeks=DEFAULT_WEEKS - 1)
+    return week_start(start_date), week_start(end_date) + timedelta(days=6)
+
+@overtime_bp.route('/admin/overtime', methods=['GET'])
+@admin_required
+@compressed
+@cached_report(overtime_period)
+def overtime_report():
+    """Heures supplémentaires par employé et par semaine ISO (admin seulement)
+
+    Lit uniquement les agrégats hebdomadaires (employee_weekly_total) ; les
+    paliers viennent de la configuration OVERTIME_TIERS.
+    """
+    try:
+        tiers = parse_tiers(current_app.config.get('OVERTIME_TIERS'))
+        first_week, last_day = overtime_period()
+        employee_id = request.args.get('employee_id', type=int)
+        overtime_only = request.args.get('overtime_only', '0') == '1'
+        format_type = request.args.get('format', 'json')  # json ou csv
+
+        query = db.session.query(
+            WeeklyTotal.week,
+            WeeklyTotal.days_worked,
+            WeeklyTotal.total_hours,
+            Employee.id,
+            Employee.employee_number,
+            Employee.first_name,
+            Employee.last_name
+        ).join(Employee, WeeklyTotal.employee_id == Employee.id).filter(
+            Employee.is_active == True,
+            WeeklyTotal.week >= first_week,
+            WeeklyTotal.week <= last_day,
+            WeeklyTotal.days_worked > 0
+        )
+        if employee_id:
+            query = query.filter(WeeklyTotal.employee_id == employee_id)
+        if overtime_only:
+            query = query.filter(WeeklyTotal.total_hours > tiers[0][0])
+        results = query.order_by(WeeklyTotal.week, Employee.last_name, Employee.first_name).all()
+
+        weeks = []
+        employees = {}
+        for result in results:
+            regular, by_tier = split_overtime(result.total_hours, tiers)
+            iso_year, iso_week, _ = result.week.isocalendar()
+            weeks.append({
+                'week': f'{iso_year}-W{iso_week:02d}',
+                'week_start': result.week.isoformat(),
+                'employee_number': result.employee_number,
+                'first_name': result.first_name,
+                'last_name': result.last_name,
+                'full_name': f'{result.first_name} {result.last_name}',
+                'days_worked': result.days_worked,
+                'total_hours': round(float(result.total_hours or 0), 2),
+                'regular_hours': round(regular, 2),
+                'overtime_hours': [round(hours, 2) for hours in by_tier],
+                'total_overtime_hours': round(sum(by_tier), 2)
+            })
+
+            totals = employees.setdefault(result.id, {
+                'employee_number': result.employee_number,
+                'full_name': f'{result.first_name} {result.last_name}',
+                'last_name': result.last_name,
+                'first_name': result.first_name,
+                'weeks': 0,
+                'total_hours': 0.0,
+                'regular_hours': 0.0,
+                'overtime_hours': [0.0] * len(tiers)
+            })
+            totals['weeks'] += 1
+            totals['total_hours'] += result.total_hours or 0.0
+            totals['regular_hours'] += regular
+            totals['overtime_hours'] = [total + hours for total, hours in zip(totals['overtime_hours'], by_tier)]
+
+        if format_type == 'csv':
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow([
+                'Semaine',
+                'Début Semaine',
+                'Numéro Employé',
+                'Prénom',
+                'Nom',
+                'Jours Travaillés',
+                'Total Heures',
+                'Heures Normales',
+                *[f'Heures Sup {tier_label(tiers, index)}' for index in range(len(tiers))],
+                'Total Heures Sup'
+            ])
+            for data in weeks:
+                writer.writerow([
+                    data['week'],
+                    data['week_start'],
+                    data['employee_number'],
+                    data['first_name'],
+                    data['last_name'],
+                    data['days_worked'],
+                    f"{data['total_hours']:.2f}",
+                    f"{data['regular_hours']:.2f}",
+                    *[f'{hours:.2f}' for hours in data['overtime_hours']],
+                    f"{data['total_overtime_hours']:.2f}"
+                ])
+
+            response = make_response(output.getvalue())
+            response.headers['Content-Type'] = 'text/csv; charset=utf-8'
+            response.headers['Content-Disposition'] = f'attachment; filename=heures_sup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+            return response
+
+        return jsonify({
+            'period': {
+                'start_date': first_week.isoformat(),
+                'end_date': last_day.isoformat()
+            },
+            'tiers': [
+                {'threshold_hours': threshold, 'rate_percent': rate, 'label': tier_label(tiers, index)}
+                for index, (threshold, rate) in enumerate(tiers)
+            ],
+            'weeks': weeks,
+            'employees': [
+                {
+                    'employee_number': totals['employee_number'],
+                    'full_name': totals['full_name'],
+                    'weeks': totals['weeks'],
+                    'total_hours': round(totals['total_hours'], 2),
+                    'regular_hours': round(totals['regular_hours'], 2),
+                    'overtime_hours': [round(hours, 2) for hours in totals['overtime_hours']],
+                    'total_overtime_hours': round(sum(totals['overtime_hours']), 2)
+                }
+                for totals in sorted(employees.values(), key=lambda item: (item['last_name'], item['first_name']))
+            ],
+            'generated_at': datetime.now().isoformat()
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Erreur lors du calcul des heures supplémentaires: {str(e)}'}), 500
@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import date
+from sqlalchemy import and_, or_
+
+class InvalidCursor(ValueError):
+    """Curseur de pagination illisible ou falsifié"""
+
+
+def encode_cursor(values):
+    """Encoder les valeurs de la clé de tri de la dernière ligne en curseur opaque"""
+    payload = [value.isoformat() if isinstance(value, date) else value for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, converters):
+    """Décoder un curseur ; `converters` convertit chaque valeur de la clé"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(converters):
+            raise InvalidCursor(cursor)
+        return [convert(value) for convert, value in zip(converters, values)]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(cursor) from e
+
+def keyset_filter(keys, values):
+    """Condition « après la ligne `values` » pour un tri sur `keys`.
+
+    `keys` est une liste de (colonne, descendant) dans l'ordre du ORDER BY.
+    La borne sur la première colonne est répétée hors du OR pour que SQLite
+    puisse se positionner directement dans l'index.
+    """
+    condition = None
+    for (column, descending), value in reversed(list(zip(keys, values))):
+        after = column < value if descending else column > value
+        condition = after if condition is None else or_(after, and_(column == value, condition))
+
+    leading_column, leading_descending = keys[0]
+    leading_bound = leading_column <= values[0] if leading_descending else leading_column >= values[0]
+    return and_(leading_bound, condition)
+
+def keyset_order(keys):
+    """Clauses ORDER BY correspondant à `keys`"""
+    return [column.desc() if descending else column.asc() for column, descending in keys]
+
+def keyset_page(query, keys, cursor, per_page, converters, row_key):
+    """Page suivant `cursor` (chaîne vide = première page), sans COUNT.
+
+    Retourne (lignes, curseur suivant ou None). `row_key` extrait la clé
+    de tri d'une ligne du résultat.
+    """
+    if cursor:
+        query = query.filter(keyset_filter(keys, decode_cursor(cursor, converters)))
+
+    rows = query.order_by(*keyset_order(keys)).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(row_key(rows[-1]))
+    return rows, next_cursor
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, date
+from functools import wraps
+from flask import request, current_app, make_response
+from src.models.rollup import month_start
+
+class ReportCache:
+    """Cache LRU des rapports générés (corps, statut et en-têtes de la réponse), par processus.
+
+    Chaque rapport est associé à la plage de mois qu'il couvre (bornes None
+    = plage ouverte) : invalidate_dates() n'oublie que les rapports couvrant
+    les mois modifiés. Les autres processus ne voient une écriture qu'à
+    l'expiration du TTL.
+    """
+
+    def __init__(self, max_size=128, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self):
+        """Compteur d'invalidations : un rapport calculé pendant une invalidation n'est pas stocké"""
+        return self._generation
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached['expires'] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            if cached:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, months, response, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = {
+                'expires': time.monotonic() + self.ttl,
+                'months': months,
+                'status': response.status_code,
+                'headers': [(name, value) for name, value in response.headers if name != 'Content-Length'],
+                'body': response.get_data()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_dates(self, *days):
+        """Oublier les rapports couvrant le mois d'une des dates (à appeler après le commit)"""
+        months = {month_start(day) for day in days}
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, cached in self._entries.items()
+                     if any(_covers(cached['months'], month) for month in months)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        """Oublier tous les rapports (ex. nom ou statut d'un employé modifié)"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+def _covers(months, month):
+    first, last = months
+    return (first is None or first <= month) and (last is None or month <= last)
+
+report_cache = ReportCache()
+
+def parse_date_arg(name):
+    """Date du paramètre `name` (YYYY-MM-DD) ou None"""
+    value = request.args.get(name)
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+def cached_report(months_of):
+    """Décorateur : servir un rapport depuis report_cache.
+
+    La clé est l'endpoint et l'ensemble des paramètres de la requête (format
+    compris) ; `months_of()` donne la plage (premier mois, dernier mois)
+    couverte par le rapport. Seules les réponses 200 sont conservées.
+    L'en-tête X-Report-Cache indique HIT ou MISS.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = (request.endpoint, tuple(sorted(request.args.items(multi=True))))
+            cached = report_cache.get(key)
+            if cached:
+                response = current_app.response_class(cached['body'], cached['status'], cached['headers'])
+                response.headers['X-Report-Cache'] = 'HIT'
+                return response
+
+            generation = report_cache.generation
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                first, last = months_of()
+                report_cache.put(key, (first and month_start(first), last and month_start(last)),
+                                 response, generation)
+            response.headers['X-Report-Cache'] = 'MISS'
+            return response
+        return decorated_function
+    return decorator
+
+def summary_months():
+    return parse_date_arg('start_date'), parse_date_arg('end_date')
+
+def monthly_months():
+    now = datetime.now()
+    month = date(request.args.get('year', now.year, type=int), request.args.get('month', now.month, type=int), 1)
+    return month, month
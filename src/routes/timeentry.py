@@ -1,65 +1,108 @@
 from flask import Blueprint, request, jsonify, session
 from datetime import datetime, date, time
-from src.models.employee import db, Employee, TimeEntry
-from src.routes.auth import login_required, admin_required
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import joinedload
+from src.models.employee import db, Employee, TimeEntry, PUNCH_TYPES, PUNCH_PREREQUISITES, PERIODS
+from src.models.rollup import LifetimeTotal, record_entry_change, totals_subquery
+from src.models.archive import ArchivePartition, entries_source
+from src.routes.auth import login_required, admin_required, terminal_or_admin_required
+from src.compression import compressed
+from src.database import retry_on_lock, is_database_locked
+from src.routes.pagination import InvalidCursor, keyset_page, keyset_order
+from src.routes.report_cache import report_cache
+from src.routes.conditional import resource_versions, today_key, today_etag, is_not_modified, not_modified_response, with_etag
 
 timeentry_bp = Blueprint('timeentry', __name__)
 
+# Message d'erreur lorsque le pointage requis manque
+PREREQUISITE_ERRORS = {
+    'lunch_out': 'Vous devez d\'abord pointer votre arrivée du matin',
+    'lunch_in': 'Vous devez d\'abord pointer votre sortie déjeuner',
+    'evening_out': 'Vous devez d\'abord pointer votre retour de déjeuner'
+}
+
+# Nombre maximal de pointages par envoi groupé
+MAX_PUNCH_BATCH = 1000
+
+def check_punch_order(time_entry, punch_type):
+    """Message d'erreur si le pointage ne respecte pas l'ordre de la journée, sinon None"""
+    if punch_type in PUNCH_PREREQUISITES:
+        if not getattr(time_entry, PUNCH_PREREQUISITES[punch_type]):
+            return PREREQUISITE_ERRORS[punch_type]
+    
+    # Vérifier si le pointage n'a pas déjà été fait
+    if getattr(time_entry, punch_type):
+        return 'Ce pointage a déjà été effectué'
+    return None
+
+# Clés de tri (colonne, descendant) de la pagination par curseur, pour la source `entries`
+def history_keys(entries):
+    return [(entries.date, True), (entries.id, True)]
+
+def entries_keys(entries):
+    return [
+        (entries.date, True),
+        (Employee.last_name, False),
+        (Employee.first_name, False),
+        (entries.id, False)
+    ]
+
 @timeentry_bp.route('/punch', methods=['POST'])
 @login_required
+@retry_on_lock
 def punch_time():
     """Enregistrer un pointage"""
     try:
         data = request.get_json()
         punch_type = data.get('type')  # morning_in, lunch_out, lunch_in, evening_out
         
-        if punch_type not in ['morning_in', 'lunch_out', 'lunch_in', 'evening_out']:
+        if punch_type not in PUNCH_TYPES:
             return jsonify({'error': 'Type de pointage invalide'}), 400
         
         employee_id = session['employee_id']
-        today = date.today()
-        current_time = datetime.now().time()
-        
-        # Rechercher ou créer l'entrée du jour
-        time_entry = TimeEntry.query.filter_by(
-            employee_id=employee_id,
-            date=today
-        ).first()
-        
-        if not time_entry:
-            time_entry = TimeEntry(
-                employee_id=employee_id,
-                date=today
-            )
-            db.session.add(time_entry)
-        
-        # Vérifier la logique des pointages
-        if punch_type == 'lunch_out' and not time_entry.morning_in:
-            return jsonify({'error': 'Vous devez d\'abord pointer votre arrivée du matin'}), 400
-        elif punch_type == 'lunch_in' and not time_entry.lunch_out:
-            return jsonify({'error': 'Vous devez d\'abord pointer votre sortie déjeuner'}), 400
-        elif punch_type == 'evening_out' and not time_entry.lunch_in:
-            return jsonify({'error': 'Vous devez d\'abord pointer votre retour de déjeuner'}), 400
-        
-        # Vérifier si le pointage n'a pas déjà été fait
-        if getattr(time_entry, punch_type):
-            return jsonify({'error': 'Ce pointage a déjà été effectué'}), 400
-        
-        # Mettre à jour le pointage
-        setattr(time_entry, punch_type, current_time)
-        
-        # Recalculer les heures
-        time_entry.calculate_hours()
+        now = datetime.now()
+        today = now.date()
+        written_at = datetime.utcnow()
+        
+        # Arrivée du matin : création de la journée si elle n'existe pas encore
+        row = None
+        if punch_type == 'morning_in':
+            row = db.session.execute(
+                TimeEntry.punch_insert_statement(employee_id, today, now.time(), written_at)
+            ).first()
+        created = row is not None
+        
+        # Sinon une seule instruction : les règles d'ordre sont dans ses conditions
+        if row is None:
+            row = db.session.execute(
+                TimeEntry.punch_statement(employee_id, today, punch_type, now.time(), written_at)
+            ).first()
+        
+        if row is None:
+            # Pointage refusé : relire l'entrée du jour pour expliquer pourquoi
+            db.session.rollback()
+            time_entry = TimeEntry.query.filter_by(employee_id=employee_id, date=today).first() or TimeEntry()
+            error = check_punch_order(time_entry, punch_type) or 'Ce pointage a déjà été effectué'
+            return jsonify({'error': error}), 400
+        
+        # Le créneau complété valait 0 avant ce pointage : ses heures sont la variation
+        period_hours = [hours for start, end, hours in PERIODS if punch_type in (start, end)][0]
+        record_entry_change(employee_id, today, getattr(row, period_hours),
+                            days_delta=1 if created else 0)
         
         db.session.commit()
+        resource_versions.invalidate(today_key(employee_id, today))
+        report_cache.invalidate_dates(today)
         
         return jsonify({
             'message': f'Pointage {punch_type} enregistré',
-            'time_entry': time_entry.to_dict()
+            'time_entry': TimeEntry.row_to_dict(row)
         }), 200
         
     except Exception as e:
         db.session.rollback()
+        if is_database_locked(e):
+            raise
         return jsonify({'error': f'Erreur lors du pointage: {str(e)}'}), 500
 
 @timeentry_bp.route('/today', methods=['GET'])
@@ -70,15 +113,20 @@ def get_today_entry():
         employee_id = session['employee_id']
         today = date.today()
         
-        time_entry = TimeEntry.query.filter_by(
+        # Pointage inchangé depuis le dernier appel du client : 304 sans sérialisation
+        etag = today_etag(employee_id, today)
+        if is_not_modified(etag):
+            return not_modified_response(etag)
+        
+        time_entry = TimeEntry.query.options(joinedload(TimeEntry.employee)).filter_by(
             employee_id=employee_id,
             date=today
         ).first()
         
         if not time_entry:
-            return jsonify({'time_entry': None}), 200
+            return with_etag(jsonify({'time_entry': None}), etag), 200
         
-        return jsonify({'time_entry': time_entry.to_dict()}), 200
+        return with_etag(jsonify({'time_entry': time_entry.to_dict()}), etag), 200
         
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la récupération des données: {str(e)}'}), 500
@@ -95,40 +143,63 @@ def get_history():
         # Limiter le nombre d'éléments par page
         per_page = min(per_page, 100)
         
-        entries = TimeEntry.query.filter_by(employee_id=employee_id)\
-                                .order_by(TimeEntry.date.desc())\
-                                .paginate(page=page, per_page=per_page, error_out=False)
+        # Projection en colonnes : une seule requête, sans chargement paresseux de l'employé
+        entries_table = entries_source(employee_id=employee_id)
+        query = TimeEntry.projection_query(entries_table).filter(entries_table.employee_id == employee_id)
+        
+        # Mode curseur : positionnement par clé (date, id), sans COUNT
+        if 'cursor' in request.args:
+            rows, next_cursor = keyset_page(
+                query, history_keys(entries_table), request.args['cursor'], per_page,
+                converters=[date.fromisoformat, int],
+                row_key=lambda row: (row.date, row.id)
+            )
+            return jsonify({
+                'entries': [TimeEntry.row_to_dict(row) for row in rows],
+                'next_cursor': next_cursor
+            }), 200
+        
+        entries = query.order_by(*keyset_order(history_keys(entries_table)))\
+                       .paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
-            'entries': [entry.to_dict() for entry in entries.items],
+            'entries': [TimeEntry.row_to_dict(row) for row in entries.items],
             'total': entries.total,
             'pages': entries.pages,
             'current_page': entries.page
         }), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Curseur de pagination invalide'}), 400
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la récupération de l\'historique: {str(e)}'}), 500
 
 @timeentry_bp.route('/summary', methods=['GET'])
 @login_required
 def get_summary():
-    """Récupérer un résumé des heures travaillées"""
+    """Récupérer un résumé des heures travaillées
+    
+    Sans période : totaux de carrière (une ligne). Avec période : somme SQL
+    des agrégats mensuels (mois complets) et journaliers (mois aux bornes).
+    """
     try:
         employee_id = session['employee_id']
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        query = TimeEntry.query.filter_by(employee_id=employee_id)
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
         
-        if start_date:
-            query = query.filter(TimeEntry.date >= datetime.strptime(start_date, '%Y-%m-%d').date())
-        if end_date:
-            query = query.filter(TimeEntry.date <= datetime.strptime(end_date, '%Y-%m-%d').date())
+        if start_date or end_date:
+            totals = totals_subquery(start_date, end_date, employee_id)
+            total_days, total_hours = db.session.query(
+                func.coalesce(func.sum(totals.c.days_worked), 0),
+                func.coalesce(func.sum(totals.c.total_hours), 0.0)
+            ).one()
+        else:
+            lifetime = db.session.get(LifetimeTotal, employee_id)
+            total_days, total_hours = (lifetime.days_worked, lifetime.total_hours) if lifetime else (0, 0.0)
         
-        entries = query.all()
-        
-        total_hours = sum(entry.total_hours for entry in entries)
-        total_days = len(entries)
         average_hours = total_hours / total_days if total_days > 0 else 0
         
         return jsonify({
@@ -145,6 +216,7 @@ def get_summary():
 
 @timeentry_bp.route('/admin/entries', methods=['GET'])
 @admin_required
+@compressed
 def get_all_entries():
     """Récupérer tous les pointages (admin seulement)"""
     try:
@@ -157,37 +229,59 @@ def get_all_entries():
         # Limiter le nombre d'éléments par page
         per_page = min(per_page, 100)
         
-        query = db.session.query(TimeEntry).join(Employee)
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        
+        # Projection en colonnes sur les seules partitions (principale, archives) de la période
+        entries_table = entries_source(start_date, end_date, employee_id)
+        query = TimeEntry.projection_query(entries_table)
         
         if employee_id:
-            query = query.filter(TimeEntry.employee_id == employee_id)
+            query = query.filter(entries_table.employee_id == employee_id)
         if start_date:
-            query = query.filter(TimeEntry.date >= datetime.strptime(start_date, '%Y-%m-%d').date())
+            query = query.filter(entries_table.date >= start_date)
         if end_date:
-            query = query.filter(TimeEntry.date <= datetime.strptime(end_date, '%Y-%m-%d').date())
+            query = query.filter(entries_table.date <= end_date)
+        
+        # Mode curseur : positionnement par clé (date, nom, prénom, id), sans COUNT
+        if 'cursor' in request.args:
+            rows, next_cursor = keyset_page(
+                query, entries_keys(entries_table), request.args['cursor'], per_page,
+                converters=[date.fromisoformat, str, str, int],
+                row_key=lambda row: (row.date, row.last_name, row.first_name, row.id)
+            )
+            return jsonify({
+                'entries': [TimeEntry.row_to_dict(row) for row in rows],
+                'next_cursor': next_cursor
+            }), 200
         
-        query = query.order_by(TimeEntry.date.desc(), Employee.last_name, Employee.first_name)
+        query = query.order_by(*keyset_order(entries_keys(entries_table)))
         
         entries = query.paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
-            'entries': [entry.to_dict() for entry in entries.items],
+            'entries': [TimeEntry.row_to_dict(row) for row in entries.items],
             'total': entries.total,
             'pages': entries.pages,
             'current_page': entries.page
         }), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Curseur de pagination invalide'}), 400
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la récupération des pointages: {str(e)}'}), 500
 
 @timeentry_bp.route('/admin/entries/<int:entry_id>', methods=['PUT'])
 @admin_required
+@retry_on_lock
 def update_entry(entry_id):
     """Modifier un pointage (admin seulement)"""
     try:
         data = request.get_json()
         
-        entry = TimeEntry.query.get_or_404(entry_id)
+        entry = TimeEntry.query.options(joinedload(TimeEntry.employee)).get_or_404(entry_id)
+        
+        previous_hours = entry.total_hours or 0.0
         
         # Mettre à jour les champs de temps
         time_fields = ['morning_in', 'lunch_out', 'lunch_in', 'evening_out']
@@ -201,10 +295,13 @@ def update_entry(entry_id):
             elif field in data and data[field] is None:
                 setattr(entry, field, None)
         
-        # Recalculer les heures
+        # Recalculer les heures et les agrégats dans la même transaction
         entry.calculate_hours()
+        record_entry_change(entry.employee_id, entry.date, entry.total_hours - previous_hours)
         
         db.session.commit()
+        resource_versions.invalidate(today_key(entry.employee_id, entry.date))
+        report_cache.invalidate_dates(entry.date)
         
         return jsonify({
             'message': 'Pointage mis à jour avec succès',
@@ -213,4 +310,145 @@ def update_entry(entry_id):
         
     except Exception as e:
         db.session.rollback()
+        if is_database_locked(e):
+            raise
         return jsonify({'error': f'Erreur lors de la mise à jour: {str(e)}'}), 500
+
+@timeentry_bp.route('/admin/punches/batch', methods=['POST'])
+@terminal_or_admin_required
+@retry_on_lock
+def ingest_punches():
+    """Enregistrer un lot de pointages hors ligne (badgeuses, admin)
+    
+    Corps : {"punches": [{"employee_number", "type", "timestamp"}, ...]}.
+    Les pointages sont appliqués par ordre chronologique avec les mêmes règles
+    que /punch, dans une seule transaction ; le résultat est donné pour chaque
+    enregistrement, dans l'ordre de l'envoi.
+    """
+    try:
+        data = request.get_json()
+        records = data.get('punches') if isinstance(data, dict) else None
+        
+        if not isinstance(records, list) or not records:
+            return jsonify({'error': 'Liste de pointages requise'}), 400
+        if len(records) > MAX_PUNCH_BATCH:
+            return jsonify({'error': f'Maximum {MAX_PUNCH_BATCH} pointages par envoi'}), 400
+        
+        results = [None] * len(records)
+        punches = []
+        
+        # Validation des enregistrements
+        for index, record in enumerate(records):
+            if not isinstance(record, dict):
+                results[index] = {'status': 'error', 'error': 'Enregistrement invalide'}
+                continue
+            if record.get('type') not in PUNCH_TYPES:
+                results[index] = {'status': 'error', 'error': 'Type de pointage invalide'}
+                continue
+            try:
+                timestamp = datetime.fromisoformat(record.get('timestamp'))
+            except (TypeError, ValueError):
+                results[index] = {'status': 'error', 'error': 'Horodatage invalide'}
+                continue
+            if timestamp.tzinfo:
+                timestamp = timestamp.astimezone().replace(tzinfo=None)
+            punches.append((timestamp, index, str(record.get('employee_number')), record['type']))
+        
+        # Employés concernés, en une requête
+        numbers = {punch[2] for punch in punches}
+        employees = {
+            row.employee_number: row
+            for row in db.session.query(Employee.id, Employee.employee_number, Employee.is_active)
+                                 .filter(Employee.employee_number.in_(numbers))
+        }
+        
+        # Pointages existants des jours concernés, en une requête
+        keys = {
+            (employees[number].id, timestamp.date())
+            for timestamp, _, number, _ in punches if number in employees
+        }
+        entries = {}
+        if keys:
+            existing = TimeEntry.query.filter(tuple_(TimeEntry.employee_id, TimeEntry.date).in_(keys))
+            entries = {(entry.employee_id, entry.date): entry for entry in existing}
+        previous_hours = {key: entry.total_hours or 0.0 for key, entry in entries.items()}
+        
+        # Années archivées (lecture seule) parmi celles des pointages reçus
+        years = {timestamp.year for timestamp, _, _, _ in punches}
+        archived_years = set()
+        if years:
+            archived_years = set(db.session.execute(
+                db.select(ArchivePartition.year).where(ArchivePartition.year.in_(years))
+            ).scalars())
+        
+        # Application dans l'ordre chronologique
+        touched = {}
+        for timestamp, index, number, punch_type in sorted(punches):
+            employee = employees.get(number)
+            if not employee:
+                results[index] = {'status': 'error', 'error': 'Employé non trouvé'}
+                continue
+            if not employee.is_active:
+                results[index] = {'status': 'error', 'error': 'Compte désactivé'}
+                continue
+            if timestamp.year in archived_years:
+                results[index] = {'status': 'error', 'error': f'Année {timestamp.year} archivée : pointage impossible'}
+                continue
+            
+            key = (employee.id, timestamp.date())
+            punch_time_value = timestamp.time()
+            time_entry = entries.get(key)
+            if time_entry is None:
+                time_entry = TimeEntry(employee_id=employee.id, date=key[1])
+                entries[key] = time_entry
+            
+            # Renvoi d'un pointage déjà enregistré (badgeuse qui réémet son tampon)
+            if getattr(time_entry, punch_type) == punch_time_value:
+                results[index] = {'status': 'duplicate'}
+                touched.setdefault(key, time_entry)
+                continue
+            
+            error = check_punch_order(time_entry, punch_type)
+            if not error:
+                position = PUNCH_TYPES.index(punch_type)
+                previous = getattr(time_entry, PUNCH_TYPES[position - 1]) if position else None
+                if previous and previous > punch_time_value:
+                    error = 'Horodatage antérieur au pointage précédent'
+            if error:
+                results[index] = {'status': 'error', 'error': error}
+                continue
+            
+            setattr(time_entry, punch_type, punch_time_value)
+            touched[key] = time_entry
+            results[index] = {'status': 'ok'}
+        
+        # Recalcul des heures une seule fois par pointage journalier modifié
+        for key, time_entry in touched.items():
+            if key not in previous_hours:
+                db.session.add(time_entry)
+            time_entry.calculate_hours()
+            record_entry_change(key[0], key[1], time_entry.total_hours - previous_hours.get(key, 0.0),
+                                days_delta=0 if key in previous_hours else 1)
+        
+        db.session.commit()
+        resource_versions.invalidate(*[today_key(*key) for key in touched])
+        report_cache.invalidate_dates(*[day for _, day in touched])
+        
+        for (timestamp, index, number, punch_type) in punches:
+            if results[index]['status'] != 'error':
+                employee = employees[number]
+                results[index]['entry_id'] = entries[(employee.id, timestamp.date())].id
+        
+        accepted = sum(1 for result in results if result['status'] != 'error')
+        return jsonify({
+            'message': f'{accepted} pointage(s) enregistré(s) sur {len(records)}',
+            'accepted': accepted,
+            'rejected': len(records) - accepted,
+            'results': [dict(result, index=index) for index, result in enumerate(results)]
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        if is_database_locked(e):
+            raise
+        return jsonify({'error': f'Erreur lors de l\'import des pointages: {str(e)}'}), 500
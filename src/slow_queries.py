@@ -0,0 +1,121 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from flask import has_request_context, request
+from sqlalchemy import event
+from src.models.employee import db
+
+logger = logging.getLogger(__name__)
+
+# Valeurs conservées telles quelles dans le journal : dates et heures (utiles pour les index)
+_KEPT_STRING = re.compile(r'^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$|^\d{2}:\d{2}(:\d{2}(\.\d+)?)?$')
+
+# Instructions dont on ne demande pas le plan
+_NO_PLAN = ('PRAGMA', 'EXPLAIN', 'CREATE', 'DROP', 'ALTER', 'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+def redact_parameters(parameters):
+    """Paramètres liés sans donnée personnelle : nombres, dates et heures gardés, autres textes masqués"""
+    def redact(value):
+        if isinstance(value, str):
+            return value if _KEPT_STRING.match(value) else f'<texte:{len(value)}>'
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return f'<binaire:{len(value)}>'
+        return value
+
+    if isinstance(parameters, dict):
+        return {name: redact(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    return parameters
+
+
+class SlowQueryLog:
+    """Anneau des dernières instructions SQL plus lentes que `threshold_ms` (par processus).
+
+    Chaque entrée garde le SQL, les paramètres masqués et la sortie de
+    EXPLAIN QUERY PLAN, exécuté sur la même connexion juste après
+    l'instruction. La durée est celle de cursor.execute() (première ligne
+    pour un SELECT, hors lecture des lignes suivantes).
+    """
+
+    def __init__(self, threshold_ms=200, capacity=100):
+        self.threshold_ms = threshold_ms
+        self._entries = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def record(self, dbapi_connection, statement, parameters, elapsed_ms, executemany):
+        if executemany and parameters:
+            parameters = parameters[0]
+        entry = {
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'duration_ms': round(elapsed_ms, 2),
+            'endpoint': request.endpoint if has_request_context() else None,
+            'sql': statement,
+            'parameters': redact_parameters(parameters),
+            'plan': self._explain(dbapi_connection, statement, parameters)
+        }
+        with self._lock:
+            self._entries.append(entry)
+        logger.warning('Requête lente (%.1f ms, %s) : %s | paramètres %s | plan %s',
+                       elapsed_ms, entry['endpoint'], statement, entry['parameters'], entry['plan'])
+
+    @staticmethod
+    def _explain(dbapi_connection, statement, parameters):
+        if statement.lstrip().upper().startswith(_NO_PLAN):
+            return None
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters or ())
+            return [row[3] for row in cursor.fetchall()]
+        except Exception as e:
+            return [f'EXPLAIN impossible : {e}']
+        finally:
+            cursor.close()
+
+    def entries(self):
+        """Entrées, de la plus récente à la plus ancienne"""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    @property
+    def capacity(self):
+        return self._entries.maxlen
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+slow_query_log = SlowQueryLog()
+
+def init_slow_query_log(app):
+    """Enregistrer les instructions lentes du moteur de l'application.
+
+    SLOW_QUERY_MS (config) fixe le seuil ; 0 désactive l'enregistrement.
+    """
+    slow_query_log.threshold_ms = app.config.get('SLOW_QUERY_MS', slow_query_log.threshold_ms)
+    if not slow_query_log.threshold_ms:
+        return
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_slow_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info['slow_query_started'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def check_slow_query(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('slow_query_started', None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= slow_query_log.threshold_ms:
+            try:
+                slow_query_log.record(conn.connection.dbapi_connection, statement, parameters,
+                                      elapsed_ms, executemany)
+            except Exception:
+                # Le journal ne doit jamais faire échouer la requête
+                logger.exception('Échec de l\'enregistrement d\'une requête lente')
@@ -0,0 +1,177 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from flask import request, send_file, abort
+
+# Manifeste généré par build_static.py (chemin -> empreinte, type, variantes compressées)
+MANIFEST_NAME = '.static-manifest.json'
+
+# Fichiers nommés avec leur empreinte par le build du frontend (Vite) : jamais modifiés
+IMMUTABLE_PREFIX = 'assets/'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Encodages précompressés, par ordre de préférence à qualité égale
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# Compression au build : types textuels d'au moins COMPRESS_MIN_SIZE octets,
+# variante conservée si elle fait gagner au moins 10 %
+COMPRESS_MIN_SIZE = 1024
+COMPRESSIBLE_TYPES = {
+    'application/javascript', 'application/json', 'application/xml',
+    'image/svg+xml', 'image/vnd.microsoft.icon', 'image/x-icon'
+}
+
+def _guess_type(path):
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+def _walk_static(static_folder):
+    """Chemins relatifs (séparateur /) des fichiers servis, hors fichiers cachés et variantes"""
+    for directory, subdirectories, files in os.walk(static_folder):
+        subdirectories[:] = [name for name in subdirectories if not name.startswith('.')]
+        for name in files:
+            if name.startswith('.'):
+                continue
+            full_path = os.path.join(directory, name)
+            if any(name.endswith(suffix) and os.path.exists(full_path[:-len(suffix)]) for _, suffix in ENCODINGS):
+                continue
+            yield os.path.relpath(full_path, static_folder).replace(os.sep, '/')
+
+def build_manifest(static_folder):
+    """Précompresser les fichiers statiques et écrire le manifeste (étape de build).
+
+    Les variantes gzip (et brotli si le module `brotli` est installé) sont
+    écrites à côté des fichiers d'origine. Retourne le manifeste.
+    """
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    compressors = {'gzip': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli:
+        compressors['br'] = lambda data: brotli.compress(data, quality=11)
+
+    files = {}
+    for path in sorted(_walk_static(static_folder)):
+        full_path = os.path.join(static_folder, path)
+        with open(full_path, 'rb') as source:
+            data = source.read()
+        content_type = _guess_type(path)
+        entry = {
+            'hash': hashlib.sha256(data).hexdigest()[:16],
+            'size': len(data),
+            'type': content_type,
+            'encodings': {}
+        }
+
+        compressible = (content_type.startswith('text/') or content_type in COMPRESSIBLE_TYPES) \
+            and len(data) >= COMPRESS_MIN_SIZE
+        for encoding, suffix in ENCODINGS:
+            variant_path = full_path + suffix
+            compressed = compressors[encoding](data) if compressible and encoding in compressors else None
+            if compressed is not None and len(compressed) <= len(data) * 0.9:
+                with open(variant_path, 'wb') as variant:
+                    variant.write(compressed)
+                entry['encodings'][encoding] = {'file': path + suffix, 'size': len(compressed)}
+            elif os.path.exists(variant_path):
+                # Variante d'une version précédente du fichier
+                os.remove(variant_path)
+        files[path] = entry
+
+    manifest = {'version': 1, 'files': files}
+    with open(os.path.join(static_folder, MANIFEST_NAME), 'w', encoding='utf-8') as output:
+        json.dump(manifest, output, indent=2, sort_keys=True)
+    return manifest
+
+def load_static_index(static_folder):
+    """Index chemin -> fichier servi, d'après le manifeste et le contenu réel du dossier.
+
+    Une entrée du manifeste n'est reprise que si la taille du fichier n'a
+    pas changé depuis le build ; sinon le fichier est servi sans variante,
+    avec une empreinte dérivée de sa taille et de sa date de modification.
+    """
+    manifest = {}
+    manifest_path = os.path.join(static_folder, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as source:
+            manifest = json.load(source).get('files', {})
+
+    index = {}
+    for path in _walk_static(static_folder):
+        stat = os.stat(os.path.join(static_folder, path))
+        entry = manifest.get(path)
+        if entry and entry['size'] == stat.st_size:
+            encodings = {
+                encoding: os.path.join(static_folder, variant['file'])
+                for encoding, variant in entry['encodings'].items()
+                if os.path.exists(os.path.join(static_folder, variant['file']))
+            }
+            etag = entry['hash']
+        else:
+            encodings = {}
+            etag = f'{int(stat.st_mtime)}-{stat.st_size}'
+        index[path] = {
+            'file': os.path.join(static_folder, path),
+            'type': entry['type'] if entry else _guess_type(path),
+            'etag': etag,
+            'encodings': encodings,
+            'immutable': path.startswith(IMMUTABLE_PREFIX)
+        }
+    return index
+
+def _negotiate(entry):
+    """Encodage précompressé accepté par le client (Accept-Encoding), ou None"""
+    candidates = [
+        (request.accept_encodings.quality(encoding), -position, encoding)
+        for position, (encoding, _) in enumerate(ENCODINGS) if encoding in entry['encodings']
+    ]
+    candidates = [candidate for candidate in candidates if candidate[0] > 0]
+    return max(candidates)[2] if candidates else None
+
+def register_static_routes(app, static_folder):
+    """Servir le frontend : `/` et `/<chemin>`, index.html pour les routes côté client.
+
+    L'index des fichiers est construit au premier appel ; chaque requête est
+    ensuite une recherche dans un dict, sans accès disque hors du fichier envoyé.
+    """
+    lock = threading.Lock()
+    state = {'index': None}
+
+    def get_index():
+        if state['index'] is None:
+            with lock:
+                if state['index'] is None:
+                    state['index'] = load_static_index(static_folder) if os.path.isdir(static_folder) else {}
+        return state['index']
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve_static_files(path):
+        """Servir les fichiers statiques du frontend"""
+        index = get_index()
+        entry = index.get(path)
+        if entry is None:
+            # Fichier d'empreinte absent : 404 plutôt qu'index.html servi comme script
+            if path.startswith(IMMUTABLE_PREFIX):
+                abort(404)
+            # Routing côté client
+            entry = index.get('index.html')
+            if entry is None:
+                return "index.html not found", 404
+
+        encoding = _negotiate(entry)
+        response = send_file(
+            entry['encodings'][encoding] if encoding else entry['file'],
+            mimetype=entry['type'],
+            etag=f"{entry['etag']}-{encoding}" if encoding else entry['etag'],
+            conditional=True
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if entry['encodings']:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if entry['immutable'] else 'no-cache'
+        return response
@@ -0,0 +1,106 @@
+"""Nombre d'instructions SQL des listes de pointages : fixe, quel que soit le nombre de lignes"""
+import os
+import sys
+from datetime import date, time, timedelta
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Hachage rapide pour les comptes de test
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+
+EMPLOYEES = 5
+PASSWORD = 'comptage'
+
+LIST_ENDPOINTS = [
+    ('admin', '/api/admin/entries?per_page=100'),
+    ('admin', '/api/admin/entries?cursor=&per_page=100'),
+    ('employee', '/api/history?per_page=100'),
+    ('employee', '/api/history?cursor=&per_page=100')
+]
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    from flask import Flask
+    from src.models.employee import db, Employee
+    from src.routes.auth import auth_bp, hash_password
+    from src.routes.timeentry import timeentry_bp
+
+    # Application minimale sur une base temporaire : seules les routes mesurées
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test'
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path_factory.mktemp('db') / 'app.db'}"
+    db.init_app(app)
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(timeentry_bp, url_prefix='/api')
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(Employee(employee_number='CPTADMIN', first_name='Admin', last_name='Test',
+                                email='admin@test.local', password_hash=hash_password(PASSWORD), is_admin=True))
+        db.session.add_all([
+            Employee(employee_number=f'CPT{i:03d}', first_name=f'Prenom{i}', last_name=f'Nom{i}',
+                     email=f'cpt{i}@test.local', password_hash=hash_password(PASSWORD))
+            for i in range(EMPLOYEES)
+        ])
+        db.session.commit()
+    return app
+
+def add_days(app, first_day, days):
+    """Ajouter `days` jours de pointages à chaque employé de test"""
+    from src.models.employee import db, Employee, TimeEntry
+
+    with app.app_context():
+        ids = [row.id for row in db.session.query(Employee.id).filter(Employee.is_admin == False)]
+        db.session.add_all([
+            TimeEntry(employee_id=employee_id, date=first_day + timedelta(days=offset),
+                      morning_in=time(8), lunch_out=time(12), lunch_in=time(13), evening_out=time(17),
+                      morning_hours=4.0, afternoon_hours=4.0, total_hours=8.0)
+            for employee_id in ids for offset in range(days)
+        ])
+        db.session.commit()
+
+def count_statements(app, clients):
+    """Nombre d'instructions SQL émises par chaque liste"""
+    from sqlalchemy import event
+    from src.models.employee import db
+
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    counts = {}
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        for session, path in LIST_ENDPOINTS:
+            statements.clear()
+            response = clients[session].get(path)
+            assert response.status_code == 200, response.get_data(as_text=True)
+            counts[path] = len(statements)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    return counts
+
+def test_list_statement_count_does_not_grow_with_rows(app):
+    clients = {'admin': app.test_client(), 'employee': app.test_client()}
+    for session, number in (('admin', 'CPTADMIN'), ('employee', 'CPT000')):
+        response = clients[session].post('/api/auth/login', json={'employee_number': number, 'password': PASSWORD})
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    start = date.today() - timedelta(days=60)
+    add_days(app, start, 2)
+    # Premier passage : caches éventuels (rôle administrateur...) remplis
+    count_statements(app, clients)
+    few = count_statements(app, clients)
+
+    # Vingt fois plus de lignes par page (100 au plus)
+    add_days(app, start + timedelta(days=2), 38)
+    many = count_statements(app, clients)
+
+    assert many == few